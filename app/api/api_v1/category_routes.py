@@ -1,30 +1,50 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from typing import List
-from app.models.category_model import Category
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 from app.models.user_model import User
 from app.schemas.category_schema import CategoryCreate, CategoryOut
+from app.services.category_service import CategoryService
 from app.api.api_v1.dependencies.user_deps import get_current_user
+from app.core.etag import etag_headers, make_etag, not_modified
+from app.core.serialization import parse_fields
 
 category_router = APIRouter()
 
 @category_router.post("/create", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
 async def create_category(data: CategoryCreate, current_user: User = Depends(get_current_user)):
-    # Check for existing category with the same name for the user
-    existing_category = await Category.find_one(Category.name == data.name, Category.owner == current_user.id)
-    if existing_category:
+    # Create and save the new category (also drops the owner's cached category list)
+    try:
+        return await CategoryService.create_category(current_user.id, data)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Category with this name already exists."
+            detail=str(e)
         )
-    # Create and save the new category    
-    new_category = Category(
-        name=data.name,
-        color=data.color,
-        owner=current_user.id
-    )
-    await new_category.insert()
-    return new_category
 
 @category_router.get("/", response_model=List[CategoryOut])
-async def list_categories(current_user: User = Depends(get_current_user)):
-    return await Category.find(Category.owner == current_user.id).to_list()
\ No newline at end of file
+async def list_categories(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Fields to return, comma separated (e.g. id,name)"),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        selected_fields = parse_fields(CategoryOut, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Conditional GET: a current If-None-Match gets a 304 without touching cache or database
+    etag = await make_etag("categories", current_user.id, request)
+    if cached := not_modified(request, etag):
+        return cached
+
+    # Served from the per-owner category cache; the database is only read on a miss
+    categories = await CategoryService.list_categories(current_user.id)
+
+    if selected_fields is None:
+        response.headers.update(etag_headers(etag))
+        return categories
+    # Sparse fieldset: skip response_model validation, which requires every field
+    return ORJSONResponse([
+        c.model_dump(mode="json", by_alias=True, include=set(selected_fields)) for c in categories
+    ], headers=etag_headers(etag))
@@ -0,0 +1,21 @@
+import secrets
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+async def require_metrics_token(request: Request):
+    """
+    Protege /metrics: exige 'Authorization: Bearer <METRICS_TOKEN>' (o formato usado
+    pelo Prometheus). Sem METRICS_TOKEN configurado, os endpoints ficam indisponíveis.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(credentials.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
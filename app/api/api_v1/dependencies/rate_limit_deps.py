@@ -0,0 +1,66 @@
+import math
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimit, rate_limit_backend
+
+LOGIN_PER_IP = RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_IP)
+LOGIN_PER_EMAIL = RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_EMAIL)
+SIGNUP_PER_IP = RateLimit.parse(settings.RATE_LIMIT_SIGNUP_PER_IP)
+SIGNUP_PER_EMAIL = RateLimit.parse(settings.RATE_LIMIT_SIGNUP_PER_EMAIL)
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _enforce(checks: List[Tuple[str, RateLimit]]):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    for key, limit in checks:
+        retry_after = await rate_limit_backend.consume(key, limit)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas. Tente novamente mais tarde.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+def _email_checks(prefix: str, email: Optional[str], limit: RateLimit) -> List[Tuple[str, RateLimit]]:
+    if not isinstance(email, str) or not email:
+        return []
+    return [(f"{prefix}:email:{email.strip().lower()}", limit)]
+
+
+async def limit_login(request: Request):
+    """
+    Limita /auth/login por IP e por e-mail, antes de qualquer consulta ao Mongo ou bcrypt.
+    O formulário já foi lido pelo FastAPI e fica em cache no request.
+    """
+    form = await request.form()
+    await _enforce(
+        [(f"login:ip:{client_ip(request)}", LOGIN_PER_IP)]
+        + _email_checks("login", form.get("username"), LOGIN_PER_EMAIL)
+    )
+
+
+async def limit_signup(request: Request):
+    """
+    Limita /users/create por IP e por e-mail, antes do hashing da senha.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    email = body.get("email") if isinstance(body, dict) else None
+    await _enforce(
+        [(f"signup:ip:{client_ip(request)}", SIGNUP_PER_IP)]
+        + _email_checks("signup", email, SIGNUP_PER_EMAIL)
+    )
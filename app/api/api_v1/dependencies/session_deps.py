@@ -0,0 +1,23 @@
+from typing import AsyncIterator, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
+from app.models.user_model import User
+from app.core.config import settings
+from app.core.database import current_session
+
+async def causal_session() -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+    """
+    Abre uma sessão causalmente consistente que vale pela requisição inteira e a deixa
+    disponível via db_session(). Leituras e escritas feitas com ela respeitam a ordem
+    entre si, mesmo quando as leituras vão para secundários.
+    """
+    if not settings.CAUSAL_CONSISTENCY_ENABLED:
+        yield None
+        return
+    # O cliente do Beanie: a sessão precisa ser do mesmo cliente das coleções
+    client = User.get_motor_collection().database.client
+    async with await client.start_session(causal_consistency=True) as session:
+        # Sem reset: o contexto da requisição termina com ela
+        current_session.set(session)
+        yield session
@@ -1,12 +1,16 @@
 from datetime import datetime, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from pydantic import ValidationError
 from uuid import UUID
 
 from app.models.user_model import User
 from app.core.config import settings
+from app.services.user_service import UserService
+from app.core.security import InvalidTokenError, decode_access_token
+from app.core.instrumentation import timed
+from app.core.database import catch_up
+from app.api.api_v1.dependencies.session_deps import causal_session
 
 from app.schemas.user_schema import TokenData
 
@@ -14,14 +18,11 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), _session=Depends(causal_session)) -> User:
     try:
-        # Decodifica o token
-        payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
+        # Decodifica o token (tokens já verificados vêm do cache até expirarem)
+        with timed("jwt"):
+            payload = decode_access_token(token)
         
         user_id: str = payload.get("sub")
         if user_id is None:
@@ -33,15 +34,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         # Validação via Pydantic V2
         token_data = TokenData(user_id=user_id)
         
-    except (JWTError, ValidationError):
+    except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Não foi possível validar as credenciais",
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    # Busca o usuário. O Beanie lida com UUID, mas passar str(UUID) é mais seguro.
-    user = await User.get(str(token_data.user_id))
+    # A sessão da requisição passa a enxergar as últimas escritas deste usuário
+    await catch_up(token_data.user_id)
+
+    # Busca o usuário (cache em processo com TTL; só vai ao Mongo em caso de miss)
+    with timed("user"):
+        user = await UserService.get_cached_user(token_data.user_id)
     
     if not user:
         raise HTTPException(
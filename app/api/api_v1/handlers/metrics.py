@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.database import pool_stats
+from app.core.changefeed import changefeed
+from app.core.instrumentation import render_metrics
+from app.core.security import password_hasher
+from app.core.rate_limit import rate_limit_backend
+from app.core.scheduler import scheduler
+from app.core.cache import backplane
+from app.services.user_service import user_cache
+from app.services.task_service import stats_cache
+from app.services.category_service import category_cache
+
+metrics_router = APIRouter()
+
+@metrics_router.get("/pool")
+async def get_pool_stats():
+    """
+    Estatísticas do pool de conexões do MongoDB neste worker:
+    conexões em uso, requisições aguardando conexão e tempo de espera.
+    """
+    return pool_stats.stats()
+
+@metrics_router.get("/runtime")
+async def get_runtime_stats():
+    """
+    Contadores em processo: caches de usuários, categorias e estatísticas, invalidações
+    trocadas com outros workers, fila do hashing de senhas, assinantes do stream de tarefas
+    e rejeições do limite de tentativas.
+    """
+    return {
+        "user_cache": user_cache.stats(),
+        "stats_cache": stats_cache.stats(),
+        "category_cache": category_cache.stats(),
+        "cache_backplane": backplane.stats(),
+        "password_hasher": password_hasher.stats(),
+        "changefeed": changefeed.stats(),
+        "rate_limit": rate_limit_backend.stats(),
+    }
+
+@metrics_router.get("/jobs")
+async def get_job_stats():
+    """
+    Jobs do agendador neste worker: próxima execução, execuções, falhas, execuções puladas
+    (ainda havia uma em andamento) e duração da última.
+    """
+    return scheduler.stats()
+
+@metrics_router.get("/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """
+    Histogramas de latência por rota e por comando do MongoDB, no formato texto do Prometheus.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
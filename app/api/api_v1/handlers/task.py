@@ -1,90 +1,299 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from typing import List, Optional
-from beanie.operators import RegEx 
+from fastapi import APIRouter, Depends, status, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, UTC
+from typing import List, Literal, Optional
 from uuid import UUID
 from app.models.task_model import Task
 from app.models.user_model import User
-from app.schemas.task_schema import TaskCreate, TaskOut, TaskUpdate
+from app.schemas.task_schema import (
+    BulkResult, ImportResult, TaskBulkDelete, TaskBulkUpdate, TaskCreate, TaskOut, TaskStats, TaskUpdate
+)
+from app.services.task_service import TaskService
+from app.services.category_service import CategoryService
+from app.core.config import settings
+from app.core.database import db_session, routed_collection
 from app.api.api_v1.dependencies.user_deps import get_current_user
-from app.models.category_model import Category
+from app.core.changefeed import ChangeFeedUnavailable, changefeed
+from app.core.etag import etag_headers, make_etag, not_modified
+from app.core.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.core.search import query_terms, ranking_pipeline
+from app.core.serialization import (
+    BSONJSONResponse, as_uuid, iter_lines, parse_fields, prepare_documents, projection_for
+)
 
 task_router = APIRouter()
 
 # 1. LISTAR 
 @task_router.get("/", response_model=List[TaskOut])
 async def list_tasks(
+    request: Request,
     task_status: Optional[bool] = None,
-    title: Optional[str] = None,
-    limit: int = 10,
+    title: Optional[str] = Query(None, max_length=100),
+    q: Optional[str] = Query(None, max_length=100),
+    limit: int = Query(10, ge=1, le=settings.LIST_MAX_LIMIT),
     skip: int = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: id,title)"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lista tarefas com filtros opcionais de status e título.
+
+    `q` faz busca por prefixos no título e na descrição, ordenada por relevância
+    (termos no título pesam mais). `title` restringe a busca ao título.
+
+    A ordem é estável por (created_at, _id). Quando há mais resultados, o header
+    `X-Next-Cursor` traz um cursor opaco; envie-o em `cursor=` para a próxima página
+    (paginação por keyset, com latência constante em qualquer profundidade).
+    `skip` continua aceito para compatibilidade, mas não pode ser combinado com `cursor`.
+
+    Caminho rápido: os documentos vêm projetados nos campos de TaskOut (ou só nos pedidos
+    em `fields=`) e são serializados direto do BSON com orjson, sem montar documentos Beanie
+    nem revalidar com o response_model.
+
+    Responde com `ETag`; com `If-None-Match` atual, retorna 304 sem executar a consulta.
+
+    Lê com a preferência de MONGO_ROUTE_READ_PREFERENCES["list_tasks"], na sessão causal
+    da requisição (as escritas do próprio usuário sempre aparecem).
     """
+    etag = await make_etag("tasks", current_user.id, request)
+    if cached := not_modified(request, etag):
+        return cached
+
     # Consulta base: tarefas do usuário atual
-    query = Task.find(Task.owner == current_user.id)
+    query = Task.find_active(Task.owner == current_user.id)
     
     # Se o usuário enviou um status, adicionamos o filtro
     if task_status is not None:
         query = query.find(Task.status == task_status)
         
-    # Se o usuário enviou um título, adicionamos o filtro com RegEx para busca parcial
-    if title:
-        query = query.find(RegEx(Task.title, title, options="i"))
-        
-    return await query.limit(limit).skip(skip).to_list()
+    # Busca por prefixos normalizados, atendida pelo índice (owner, search_terms)
+    try:
+        search = query_terms(q) if q else None
+        title_search = query_terms(title) if title else None
+        selected_fields = parse_fields(TaskOut, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Só os campos de TaskOut (ou os pedidos) trafegam do Mongo
+    projection = projection_for(TaskOut, selected_fields)
+
+    if title_search:
+        query = query.find({"search_terms": {"$all": title_search}, "title_terms": {"$all": title_search}})
+
+    if search:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A busca 'q' é ordenada por relevância e não aceita 'cursor'; use 'skip'."
+            )
+        query = query.find({"search_terms": {"$all": search}})
+        pipeline = ranking_pipeline(search) + [
+            {"$skip": skip}, {"$limit": limit}, {"$project": projection}
+        ]
+        docs = await routed_collection(Task, "list_tasks").aggregate(
+            [{"$match": query.get_filter_query()}] + pipeline, session=db_session()
+        ).to_list(None)
+        return BSONJSONResponse(prepare_documents(docs, selected_fields), headers=etag_headers(etag))
+
+    if cursor:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use 'cursor' ou 'skip', não ambos."
+            )
+        try:
+            after_created_at, after_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.find(keyset_filter(after_created_at, after_id))
+
+    # Buscamos um item a mais para saber se existe próxima página
+    mongo_cursor = (
+        routed_collection(Task, "list_tasks")
+        .find(query.get_filter_query(), {**projection, "created_at": 1}, session=db_session())  # created_at: chave do cursor
+        .sort([("created_at", 1), ("_id", 1)])
+        .skip(skip)
+        .limit(limit + 1)
+    )
+    docs = await mongo_cursor.to_list(length=limit + 1)
+
+    headers = etag_headers(etag)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1]["created_at"], as_uuid(docs[-1]["_id"]))
+
+    return BSONJSONResponse(prepare_documents(docs, selected_fields), headers=headers)
 
 # 2. CRIAR
 @task_router.post("/create", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
 async def create_task(data: TaskCreate, current_user: User = Depends(get_current_user)):
     
-    # Validação de Segurança Comercial
+    # Validação de Segurança Comercial (a partir do cache de categorias do usuário)
     if data.category:
-        category_exists = await Category.find_one(
-            Category.id == data.category, 
-            Category.owner == current_user.id
-        )
-        if not category_exists:
+        if not await CategoryService.owned_category_ids(current_user.id, [data.category]):
             raise HTTPException(
                 status_code=404, 
                 detail="A categoria informada não foi encontrada ou não pertence a você."
             )
 
-    new_task = Task(
-        title=data.title,
-        description=data.description,
-        owner=current_user.id,
-        category=data.category # Salvamos o UUID da categoria na tarefa
+    return await TaskService.create_task(current_user.id, data)
+
+# 2.1 OPERAÇÕES EM LOTE (registradas antes de /{task_id} para não colidirem com o path param)
+def _check_bulk_size(count: int):
+    if count > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.BULK_MAX_ITEMS} itens por requisição."
+        )
+
+def _bulk_result(results) -> BulkResult:
+    failed = sum(1 for r in results if r.status == "error")
+    return BulkResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+@task_router.post("/bulk", response_model=BulkResult)
+async def bulk_create_tasks(items: List[TaskCreate], current_user: User = Depends(get_current_user)):
+    """
+    Cria várias tarefas com um único insert_many (não ordenado).
+    Cada item tem seu próprio resultado; falhas não impedem os demais.
+    """
+    _check_bulk_size(len(items))
+    return _bulk_result(await TaskService.bulk_create(current_user.id, items))
+
+@task_router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_tasks(items: List[TaskBulkUpdate], current_user: User = Depends(get_current_user)):
+    """
+    Atualiza várias tarefas com um único bulk_write (não ordenado).
+    """
+    _check_bulk_size(len(items))
+    return _bulk_result(await TaskService.bulk_update(current_user.id, items))
+
+@task_router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_tasks(data: TaskBulkDelete, current_user: User = Depends(get_current_user)):
+    """
+    Remove várias tarefas do usuário com um único delete_many.
+    """
+    _check_bulk_size(len(data.ids))
+    return _bulk_result(await TaskService.bulk_delete(current_user.id, data.ids))
+
+@task_router.post("/import", response_model=ImportResult)
+async def import_tasks(request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Importa tarefas de um upload NDJSON (uma tarefa por linha, no formato de /tasks/create).
+    O corpo é lido em streaming e gravado em blocos; a resposta resume o que foi importado
+    e traz os erros por linha (limitados a IMPORT_MAX_ERRORS).
+    """
+    lines = iter_lines(request.stream(), settings.IMPORT_MAX_LINE_BYTES)
+    return await TaskService.import_tasks(current_user.id, lines)
+
+# 2.2 ESTATÍSTICAS (também antes de /{task_id})
+@task_router.get("/stats", response_model=TaskStats)
+async def task_stats(
+    days: int = Query(30, ge=1, le=settings.STATS_MAX_DAYS, description="Janela da contagem por dia"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Totais de tarefas concluídas/pendentes, por categoria e criadas por dia (UTC),
+    calculados no MongoDB com uma única agregação e mantidos em cache até a próxima escrita.
+    """
+    stats = await TaskService.get_stats(current_user.id)
+    cutoff = (datetime.now(UTC) - timedelta(days=days - 1)).date()
+    return stats.model_copy(update={"by_day": [day for day in stats.by_day if day.day >= cutoff]})
+
+# 2.3 EXPORTAÇÃO (também antes de /{task_id})
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+@task_router.get("/export")
+async def export_tasks(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    task_status: Optional[bool] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exporta todas as tarefas do usuário (NDJSON, uma tarefa por linha, ou CSV com cabeçalho),
+    em streaming direto do cursor do Mongo: sem limite de página e com memória constante.
+    """
+    return StreamingResponse(
+        TaskService.export_tasks(current_user.id, fmt, task_status),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"'}
+    )
+
+# 2.4 ALTERAÇÕES EM TEMPO REAL (SSE, também antes de /{task_id})
+@task_router.get("/stream")
+async def stream_tasks(
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events com as inserções, alterações e remoções das tarefas do usuário.
+    O `id` de cada evento é o resume token: ao reconectar com `Last-Event-ID`, os eventos
+    perdidos são reenviados; se não for mais possível, chega um evento `reset` e o cliente
+    deve recarregar a lista. Requer MongoDB em replica set (503 caso contrário).
+    """
+    try:
+        subscription = await changefeed.subscribe(Task.get_motor_collection(), current_user.id, last_event_id)
+    except ChangeFeedUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return StreamingResponse(
+        subscription.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    await new_task.insert()
-    return new_task
 
 # 3. BUSCAR UMA TAREFA ESPECÍFICA
 @task_router.get("/{task_id}", response_model=TaskOut)
-async def get_task(task_id: UUID, current_user: User = Depends(get_current_user)):
-    task = await Task.find_one(Task.id == task_id, Task.owner == current_user.id)
-    if not task:
+async def get_task(
+    task_id: UUID,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Responde com `ETag` (versão das tarefas do usuário + path, que inclui o id da tarefa).
+    O 304 só é dado depois de confirmar que a tarefa existe e é do usuário: uma tarefa
+    removida ou inexistente é sempre 404, mesmo com `If-None-Match: *`.
+    """
+    # Calculado antes da consulta: uma escrita concorrente nunca fica com um ETag antigo
+    etag = await make_etag("tasks", current_user.id, request)
+
+    raw = await routed_collection(Task, "get_task").find_one(
+        Task.find_active(Task.id == task_id, Task.owner == current_user.id).get_filter_query(),
+        session=db_session()
+    )
+    if not raw:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    # Com If-None-Match atual, 304 sem validar nem serializar o documento
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers.update(etag_headers(etag))
+    return Task.model_validate(raw)
 
 # 4. ATUALIZAR (PUT)
 @task_router.put("/{task_id}", response_model=TaskOut)
 async def update_task(task_id: UUID, data: TaskUpdate, current_user: User = Depends(get_current_user)):
-    task = await Task.find_one(Task.id == task_id, Task.owner == current_user.id)
+    # Atualiza apenas os campos enviados no JSON
+    changes = data.model_dump(exclude_unset=True)
+
+    # Validação de Segurança Comercial: a nova categoria precisa ser do usuário
+    if changes.get("category"):
+        if not await CategoryService.owned_category_ids(current_user.id, [changes["category"]]):
+            raise HTTPException(
+                status_code=404, 
+                detail="A categoria informada não foi encontrada ou não pertence a você."
+            )
+
+    # Um único find_one_and_update filtrado por owner, retornando o documento já atualizado
+    task = await TaskService.update_task(current_user.id, task_id, changes)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Atualiza apenas os campos enviados no JSON
-    await task.update({"$set": data.model_dump(exclude_unset=True)})
     return task
 
 # 5. DELETAR
 @task_router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(task_id: UUID, current_user: User = Depends(get_current_user)):
-    task = await Task.find_one(Task.id == task_id, Task.owner == current_user.id)
-    if not task:
+    # Remoção lógica: um único update_one filtrado por owner
+    if not await TaskService.delete_task(current_user.id, task_id):
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    await task.delete()
     return None
\ No newline at end of file
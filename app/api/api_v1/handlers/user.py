@@ -1,30 +1,24 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.models.user_model import User 
-from app.schemas.user_schema import UserAuth, UserDetail 
-from app.core.security import hash_password 
+from app.schemas.user_schema import UserAuth, UserDetail, UserUpdate
+from app.services.user_service import UserService
 from app.api.api_v1.dependencies.user_deps import get_current_user 
+from app.api.api_v1.dependencies.rate_limit_deps import limit_signup
 
 user_router = APIRouter()
 
-@user_router.post("/create", response_model=UserDetail, status_code=status.HTTP_201_CREATED)
+@user_router.post(
+    "/create", response_model=UserDetail, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_signup)]
+)
 async def create_user(data: UserAuth):
-    # 1. Verifica se usuário existe
-    user_exists = await User.by_email(data.email)
-    if user_exists:
+    try:
+        return await UserService.create_user(data)
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="The user with this email already exists."
         )
-    
-    # 2. Cria o usuário
-    user = User(
-        username=data.username,
-        email=data.email,
-        hash_password=hash_password(data.password) 
-    )
-
-    await user.insert()
-    return user
 
 # NOVA ROTA: Essencial para o gerenciamento do usuário
 @user_router.get("/me", response_model=UserDetail)
@@ -35,3 +29,12 @@ async def get_me(user: User = Depends(get_current_user)):
     """
     return user
 
+@user_router.put("/me", response_model=UserDetail)
+async def update_me(data: UserUpdate, user: User = Depends(get_current_user)):
+    """
+    Atualiza o perfil do usuário atual (invalida o cache de autenticação).
+    """
+    try:
+        return await UserService.update_user(user.id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
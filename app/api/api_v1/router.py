@@ -1,8 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.api.auth.jwt import auth_router
 from app.api.api_v1.handlers.user import user_router
 from app.api.api_v1.handlers.task import task_router
 from app.api.api_v1.category_routes import category_router
+from app.api.api_v1.handlers.metrics import metrics_router
+from app.api.api_v1.dependencies.metrics_deps import require_metrics_token
 
 router = APIRouter()
 
@@ -11,5 +13,9 @@ router.include_router(auth_router, prefix='/auth', tags=['auth'])
 router.include_router(user_router, prefix='/users', tags=['users'])
 router.include_router(task_router, prefix='/tasks', tags=['tasks']) 
 router.include_router(category_router, prefix='/categories', tags=['categories'])
+# Métricas internas: só com o token de METRICS_TOKEN
+router.include_router(
+    metrics_router, prefix='/metrics', tags=['metrics'], dependencies=[Depends(require_metrics_token)]
+)
 
 # Adicionar mais roteadores conforme necessário
\ No newline at end of file
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Any
-from jose import jwt
+from uuid import UUID
 from pydantic import ValidationError
 
 from app.services.user_service import UserService
 from app.schemas.user_schema import Token, UserDetail  
-from app.core.security import create_access_token, create_refresh_token
+from app.core.security import (
+    InvalidTokenError, create_access_token, create_refresh_token, decode_refresh_token
+)
 from app.api.api_v1.dependencies.user_deps import get_current_user
+from app.api.api_v1.dependencies.rate_limit_deps import limit_login
 from app.models.user_model import User
-from app.core.config import settings
 
 auth_router = APIRouter()
 
-@auth_router.post("/login", response_model=Token)
+@auth_router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     user = await UserService.authenticate_user(
         email=form_data.username, 
@@ -39,16 +41,13 @@ async def refresh_token(refresh_token: str = Body(..., embed=True)):
     O 'embed=True' espera um JSON como {"refresh_token": "..."}
     """
     try:
-        payload = jwt.decode(
-            refresh_token, 
-            settings.JWT_REFRESH_SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id = payload.get("sub")
-        if not user_id:
+        payload = decode_refresh_token(refresh_token)
+        try:
+            user_id = UUID(str(payload.get("sub")))
+        except ValueError:
             raise HTTPException(status_code=401, detail="Invalid token")
-            
-        user = await User.get(user_id)
+
+        user = await UserService.get_cached_user(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
             
@@ -58,7 +57,7 @@ async def refresh_token(refresh_token: str = Body(..., embed=True)):
             "token_type": "bearer",
         }
         
-    except (jwt.JWTError, ValidationError):
+    except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Não foi possível validar as credenciais",
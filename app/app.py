@@ -1,25 +1,80 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
 
 # Importamos apenas o roteador principal e as configurações
 from app.api.api_v1.router import router as api_router
 from app.core.config import settings
+from app.core.security import password_hasher, token_cache
+from app.core.changefeed import changefeed
+from app.core.indexes import verify_indexes
+from app.core.database import create_client, warm_pool
+from app.core.instrumentation import TimingMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.scheduler import scheduler
+from app.core.cache import backplane
+from app.core.etag import versions
 from app.models.task_model import Task
 from app.models.user_model import User
 from app.models.category_model import Category
+from app.models.task_archive_model import TaskArchive
+from app.services.archive_service import ArchiveService
+from app.services.user_service import user_cache
+from app.services.task_service import stats_cache
+from app.services.category_service import category_cache
+
+DOCUMENT_MODELS = [User, Task, Category, TaskArchive]
+
+async def purge_expired_caches():
+    # Roda no event loop (os caches não têm lock); tokens expirados saem do token_cache aqui
+    for cache in (token_cache, user_cache, stats_cache, category_cache, versions):
+        cache.purge_expired()
+
+async def check_indexes():
+    await verify_indexes(DOCUMENT_MODELS)
+
+def register_jobs():
+    """
+    Jobs de manutenção do agendador (ver /metrics/jobs).
+    """
+    scheduler.add_job("purge_caches", purge_expired_caches, every=settings.CACHE_PURGE_INTERVAL_SECONDS)
+    scheduler.add_job("verify_indexes", check_indexes, cron=settings.INDEX_CHECK_CRON,
+                      jitter=settings.SCHEDULER_JITTER_SECONDS)
+    if settings.SEARCH_BACKFILL_ENABLED:
+        scheduler.add_job("backfill_search_terms", Task.backfill_search_terms,
+                          every=settings.SEARCH_BACKFILL_INTERVAL_SECONDS, jitter=settings.SCHEDULER_JITTER_SECONDS)
+    if settings.ARCHIVE_ENABLED:
+        # Tarefas concluídas/removidas antigas vão para tasks_archive
+        scheduler.add_job("archive_tasks", ArchiveService.archive_tasks, every=settings.ARCHIVE_INTERVAL_SECONDS,
+                          jitter=settings.SCHEDULER_JITTER_SECONDS, run_on_start=True)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Inicialização do Banco
-    db_client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    db_client = create_client()
+    await warm_pool(db_client, settings.MONGO_MIN_POOL_SIZE)
     await init_beanie(
         database=db_client.get_default_database(),
-        document_models=[User, Task, Category]  # Registrando o modelo Category
+        document_models=DOCUMENT_MODELS  # Registrando o modelo Category
     )
+    if settings.MULTI_WORKER:
+        # Tier compartilhado dos caches e invalidação entre workers
+        await backplane.start(db_client.get_default_database())
+    # Reporta índices que divergem do declarado nos modelos (não bloqueia a subida)
+    await verify_indexes(DOCUMENT_MODELS)
+    if settings.SEARCH_BACKFILL_ENABLED:
+        # Antes de atender: 'q' e 'title' só consultam os campos de busca
+        await Task.backfill_search_terms()
+    if settings.SCHEDULER_ENABLED:
+        register_jobs()
+        scheduler.start()
     yield
+    await scheduler.shutdown()
+    scheduler.clear()
+    await changefeed.close()
+    await backplane.close()
     db_client.close()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="TODOFast API - Boilerplate Profissional com FastAPI e Pydantic V2",
@@ -40,6 +95,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Server-Timing e histogramas por rota (middleware ASGI puro)
+app.add_middleware(TimingMiddleware)
+# Compressão negociada por Accept-Encoding (externa ao timing: o Server-Timing não inclui a compressão)
+app.add_middleware(CompressionMiddleware)
+
 # Unindo as rotas através do agregador api_router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC
+from typing import Any, Callable, Dict, Hashable, Optional
+from uuid import uuid4
+
+from bson import ObjectId
+from pymongo import ASCENDING, CursorType, ReturnDocument
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração (TTL) e despejo LRU.
+    Pensado para o event loop: sem locks, todas as operações são O(1).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        if maxsize <= 0:
+            raise ValueError("maxsize deve ser maior que zero")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        # Marca como usado recentemente (LRU)
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Guarda o valor; `ttl` sobrescreve o TTL padrão para esta entrada.
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """
+        Remove as entradas já expiradas (que, sem leitura, só sairiam pelo despejo LRU).
+        Retorna quantas foram removidas.
+        """
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CacheBackplane:
+    """
+    Coordena os caches entre workers (MULTI_WORKER): guarda o tier compartilhado na
+    coleção cache_entries (expirada por índice TTL) e publica invalidações na coleção
+    capped cache_events, lida por cada worker com um cursor tailable.
+
+    As invalidações são idempotentes, então ao reabrir o cursor o listener volta um
+    segundo para trás em vez de depender da ordem exata dos ObjectIds entre processos.
+    Se o listener ficar para trás mais que o tamanho da coleção capped, eventos se perdem;
+    o TTL de cada cache limita quanto tempo um valor defasado pode sobreviver.
+    """
+
+    def __init__(self):
+        self.origin = uuid4().hex
+        self.entries = None
+        self._events = None
+        self._caches: Dict[str, "Cache"] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._events is not None
+
+    def register(self, cache: "Cache") -> None:
+        if cache.name in self._caches:
+            raise ValueError(f"Cache já registrado: {cache.name}")
+        self._caches[cache.name] = cache
+
+    async def start(self, database) -> None:
+        try:
+            await database.create_collection(
+                "cache_events", capped=True, size=settings.CACHE_EVENTS_SIZE_BYTES
+            )
+        except CollectionInvalid:
+            pass  # Já existe (criada por outro worker)
+        self._events = database["cache_events"]
+        self.entries = database["cache_entries"]
+        await self.entries.create_index([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+        self._task = asyncio.create_task(self._listen(datetime.now(UTC)))
+
+    async def publish(self, cache: str, key: Optional[str]) -> None:
+        if self._events is None:
+            return
+        await self._events.insert_one({"origin": self.origin, "cache": cache, "key": key})
+        self.published += 1
+
+    async def _listen(self, since: datetime) -> None:
+        while True:
+            query = {"_id": {"$gt": ObjectId.from_datetime(since - timedelta(seconds=1))}, "origin": {"$ne": self.origin}}
+            cursor = self._events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for event in cursor:
+                        since = max(since, event["_id"].generation_time)
+                        self._apply(event)
+                    # Cursor tailable sem eventos novos: o driver retorna e espera de novo
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                await cursor.close()
+                raise
+            except PyMongoError as e:
+                logger.warning("Listener de invalidação de cache interrompido (%s); reabrindo.", e)
+            await cursor.close()
+            await asyncio.sleep(1)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        cache = self._caches.get(event["cache"])
+        if cache is None:
+            return
+        self.received += 1
+        if event["key"] is None:
+            cache.local.clear()
+        else:
+            cache.local.invalidate(event["key"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "listening": self._task is not None and not self._task.done(),
+            "published": self.published,
+            "received": self.received,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._events = None
+        self.entries = None
+
+
+backplane = CacheBackplane()
+
+# Marca, no nível local, uma chave que também faltou no tier compartilhado
+_MISSING = object()
+
+
+class Cache:
+    """
+    Cache de dois níveis: TTLCache local (LRU, por worker) e, com `shared=True` e o
+    backplane ativo, a coleção cache_entries compartilhada entre workers. Invalidações
+    limpam os dois níveis e são publicadas para os demais workers.
+    Valores do tier compartilhado passam por `dump`/`load` (precisam virar BSON).
+    Com `miss_ttl`, ausências no tier compartilhado ficam registradas localmente por esse
+    tempo (sem uma consulta por leitura); gravações então são publicadas, para que os
+    demais workers descartem a ausência registrada.
+    Sem MULTI_WORKER, comporta-se como o TTLCache local.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, shared: bool = False,
+                 dump: Callable[[Any], Any] = lambda value: value,
+                 load: Callable[[Any], Any] = lambda value: value,
+                 plane: Optional[CacheBackplane] = None, miss_ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self._dump = dump
+        self._load = load
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.plane = plane or backplane
+        self.plane.register(self)
+
+    @staticmethod
+    def key(key: Hashable) -> str:
+        if isinstance(key, bytes):
+            return key.hex()
+        if isinstance(key, tuple):
+            return ":".join(map(str, key))
+        return str(key)
+
+    def _entries(self):
+        return self.plane.entries if self.shared else None
+
+    def _entry_id(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        key = self.key(key)
+        value = self.local.get(key)
+        if value is _MISSING:
+            return None
+        entries = self._entries()
+        if value is not None or entries is None:
+            return value
+
+        now = datetime.now(UTC)
+        doc = await entries.find_one({"_id": self._entry_id(key), "expires_at": {"$gt": now}})
+        if doc is None:
+            self.shared_misses += 1
+            if self.miss_ttl:
+                self.local.set(key, _MISSING, ttl=self.miss_ttl)
+            return None
+        self.shared_hits += 1
+        value = self._load(doc["value"])
+        remaining = (doc["expires_at"].replace(tzinfo=UTC) - now).total_seconds()
+        self.local.set(key, value, ttl=min(self.ttl, remaining))
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        key = self.key(key)
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=ttl)
+        entries = self._entries()
+        if entries is not None:
+            await entries.update_one(
+                {"_id": self._entry_id(key)},
+                {"$set": {"value": self._dump(value), "expires_at": datetime.now(UTC) + timedelta(seconds=ttl)}},
+                upsert=True,
+            )
+            if self.miss_ttl:
+                await self.plane.publish(self.name, key)
+
+    async def setdefault(self, key: Hashable, value: Any) -> Any:
+        """
+        Retorna o valor em cache; se não houver, guarda `value`. No tier compartilhado a
+        operação é atômica, para que todos os workers fiquem com o mesmo valor.
+        """
+        key = self.key(key)
+        current = self.local.get(key)
+        if current is not None and current is not _MISSING:
+            return current
+        entries = self._entries()
+        if entries is None:
+            self.local.set(key, value)
+            return value
+
+        alive = {"$gt": ["$expires_at", "$$NOW"]}
+        doc = await entries.find_one_and_update(
+            {"_id": self._entry_id(key)},
+            [{"$set": {
+                "value": {"$cond": [alive, "$value", self._dump(value)]},
+                "expires_at": {"$cond": [alive, "$expires_at", datetime.now(UTC) + timedelta(seconds=self.ttl)]},
+            }}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        current = self._load(doc["value"])
+        remaining = (doc["expires_at"].replace(tzinfo=UTC) - datetime.now(UTC)).total_seconds()
+        self.local.set(key, current, ttl=max(0.0, min(self.ttl, remaining)))
+        return current
+
+    async def invalidate(self, key: Hashable) -> None:
+        key = self.key(key)
+        self.local.invalidate(key)
+        entries = self._entries()
+        if entries is not None:
+            await entries.delete_one({"_id": self._entry_id(key)})
+        await self.plane.publish(self.name, key)
+
+    def purge_expired(self) -> int:
+        return self.local.purge_expired()
+
+    def clear(self) -> None:
+        """Limpa apenas o nível local (testes e desligamento)."""
+        self.local.clear()
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        if self.shared:
+            stats.update(shared_hits=self.shared_hits, shared_misses=self.shared_misses)
+        return stats
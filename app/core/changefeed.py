@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.core.serialization import as_uuid, dumps_bson
+
+logger = logging.getLogger(__name__)
+
+# Campos de tarefa enviados nos eventos (os mesmos de TaskOut)
+EVENT_FIELDS = ("title", "description", "status", "created_at", "category")
+
+
+class ChangeFeedUnavailable(Exception):
+    """
+    Change streams exigem replica set ou cluster shardado.
+    """
+
+
+class Subscription:
+    """
+    Conexão de um cliente: fila limitada de eventos SSE já formatados.
+    Se a fila encher (cliente lento), a assinatura é encerrada com um evento 'reset'.
+    """
+
+    def __init__(self, feed: "ChangeFeed", owner: UUID):
+        self.feed = feed
+        self.owner = owner
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=settings.CHANGEFEED_QUEUE_SIZE)
+        self.closed = False
+
+    def push(self, message: bytes) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.reset()
+
+    def reset(self) -> None:
+        # Descarta o que estava na fila: o cliente deve recarregar a lista e reconectar
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(self.feed.reset_message())
+        self.closed = True
+        self.feed.unsubscribe(self)
+
+    async def events(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.queue.get(), settings.CHANGEFEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comentário SSE: mantém a conexão viva em proxies
+                    yield b": keepalive\n\n"
+                    continue
+                yield message
+                if self.closed and self.queue.empty():
+                    return
+        finally:
+            self.feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """
+    Um único change stream por processo na coleção de tarefas, repassado aos assinantes
+    de cada owner. Guarda os últimos eventos (CHANGEFEED_HISTORY_SIZE) para que um cliente
+    que reconecta com Last-Event-ID (o resume token) receba o que perdeu; se o token já
+    saiu do histórico, recebe 'reset' e deve recarregar via GET /tasks.
+    O stream só é aberto no primeiro assinante.
+    """
+
+    def __init__(self):
+        self._collection = None
+        self._subscribers: Dict[UUID, Set[Subscription]] = defaultdict(set)
+        self._history: Deque[Tuple[str, Optional[UUID], bytes]] = deque(maxlen=settings.CHANGEFEED_HISTORY_SIZE)
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._pre_images = False
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+    def reset_message(self) -> bytes:
+        # O id aponta para a posição atual, para que a reconexão não volte a cair no reset
+        latest = self._history[-1][0] if self._history else ""
+        return f"id: {latest}\nevent: reset\ndata: {{}}\n\n".encode()
+
+    async def _ensure_started(self, collection) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        async with self._start_lock:
+            if self._task is not None and not self._task.done():
+                return
+            hello = await collection.database.client.admin.command("hello")
+            if not hello.get("setName") and hello.get("msg") != "isdbgrid":
+                raise ChangeFeedUnavailable("O MongoDB precisa ser um replica set para o stream de tarefas.")
+
+            # Pré-imagens (MongoDB 6+) permitem saber o owner de tarefas removidas
+            try:
+                await collection.database.command(
+                    "collMod", collection.name, changeStreamPreAndPostImages={"enabled": True}
+                )
+                self._pre_images = True
+            except OperationFailure as e:
+                logger.warning("Pré-imagens de change stream indisponíveis (%s); remoções não serão enviadas.", e)
+
+            self._collection = collection
+            stream = self._open()
+            # Abre o cursor antes de liberar o assinante, para não perder eventos
+            first = await stream.try_next()
+            if first is not None and "documentKey" in first:
+                self._dispatch(first)
+            self._resume_token = stream.resume_token
+            self._task = asyncio.create_task(self._run(stream))
+
+    def _open(self):
+        options: Dict[str, Any] = {"full_document": "updateLookup"}
+        if self._pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        if self._resume_token is not None:
+            options["resume_after"] = self._resume_token
+        pipeline = [{"$project": {
+            "operationType": 1,
+            "documentKey": 1,
+            **{f"fullDocument.{field}": 1 for field in ("owner", "deleted_at", *EVENT_FIELDS)},
+            "fullDocumentBeforeChange.owner": 1,
+        }}]
+        return self._collection.watch(pipeline, **options)
+
+    async def _run(self, stream) -> None:
+        while True:
+            try:
+                async for change in stream:
+                    if "documentKey" not in change:
+                        # drop/rename/invalidate: o stream se encerra e é reaberto do zero
+                        logger.warning("Change stream de tarefas invalidado (%s).", change["operationType"])
+                        self._resume_token = None
+                        continue
+                    self._dispatch(change)
+                    self._resume_token = stream.resume_token
+                await stream.close()
+                await asyncio.sleep(1)
+                stream = self._open()
+            except asyncio.CancelledError:
+                await stream.close()
+                raise
+            except PyMongoError as e:
+                # Erros transitórios já são retomados pelo driver; aqui reabrimos do último token
+                logger.warning("Change stream de tarefas interrompido (%s); reabrindo.", e)
+                await stream.close()
+                await asyncio.sleep(1)
+                stream = self._open()
+
+    def _dispatch(self, change: Dict[str, Any]) -> None:
+        document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+        owner = as_uuid(document["owner"]) if document.get("owner") is not None else None
+        event_id = change["_id"]["_data"]
+        operation = change["operationType"]
+
+        task = None
+        if change.get("fullDocument") and change["fullDocument"].get("deleted_at"):
+            # Remoção lógica chega como update; para o cliente é uma remoção
+            operation = "delete"
+        elif change.get("fullDocument"):
+            task = {field: change["fullDocument"].get(field) for field in EVENT_FIELDS}
+        data = dumps_bson({"id": change["documentKey"]["_id"], "task": task})
+        message = f"id: {event_id}\nevent: {operation}\ndata: ".encode() + data + b"\n\n"
+
+        self._history.append((event_id, owner, message))
+        if owner is None:
+            return
+        for subscription in list(self._subscribers.get(owner, ())):
+            subscription.push(message)
+
+    async def subscribe(self, collection, owner: UUID, last_event_id: Optional[str] = None) -> Subscription:
+        await self._ensure_started(collection)
+        subscription = Subscription(self, owner)
+        self._subscribers[owner].add(subscription)
+
+        # Sem await entre o registro e o replay: nenhum evento novo se intercala
+        if last_event_id:
+            position = next(
+                (i for i, (event_id, _, _) in enumerate(self._history) if event_id == last_event_id), None
+            )
+            if position is None:
+                subscription.reset()
+            else:
+                for _, event_owner, message in list(self._history)[position + 1:]:
+                    if event_owner == owner:
+                        subscription.push(message)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.owner)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.owner]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "history": len(self._history),
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+changefeed = ChangeFeed()
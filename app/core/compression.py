@@ -0,0 +1,204 @@
+import zlib
+from typing import Callable, Dict, Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:  # Opcionais: só negociados se instalados
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+)
+# SSE precisa de cada evento entregue na hora; nada de buffer de compressão
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+class Encoder(Protocol):
+    """
+    Compressor incremental: `compress` devolve o bloco já descarregado (sync flush),
+    para que respostas em streaming cheguem ao cliente sem esperar o fim.
+    """
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS: Dict[str, Callable[[], Encoder]] = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe a codificação pela ordem de COMPRESSION_ENCODINGS entre as aceitas pelo cliente (q > 0).
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        if encoding in ENCODERS and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+async def _run(func: Callable[[bytes], bytes], data: bytes) -> bytes:
+    # Blocos grandes são comprimidos fora do event loop
+    if len(data) >= settings.COMPRESSION_THREAD_THRESHOLD:
+        return await run_in_threadpool(func, data)
+    return func(data)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI puro que comprime respostas com gzip (e br/zstd, se instalados).
+    Corpos completos abaixo de COMPRESSION_MINIMUM_SIZE seguem sem compressão; respostas
+    em streaming são comprimidas bloco a bloco. O ETag passa a ser fraco quando o corpo
+    é comprimido, como a representação deixa de ser idêntica byte a byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSender(send, encoding).send)
+
+
+class _CompressingSender:
+    def __init__(self, send: Send, encoding: str):
+        self._send = send
+        self._encoding = encoding
+        self._start: Optional[Message] = None
+        self._encoder: Optional[Encoder] = None
+        self._passthrough = False
+
+    def _compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            message["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(EXCLUDED_TYPES)
+        )
+
+    def _encoded_start(self) -> Message:
+        headers = MutableHeaders(scope=self._start)
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return self._start
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            if not self._compressible(message):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                # Só decide ao ver o primeiro bloco do corpo (tamanho e se é streaming)
+                self._start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self._encoder is None:
+            if not more_body and len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                self._passthrough = True
+                MutableHeaders(scope=self._start).add_vary_header("Accept-Encoding")
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._encoder = ENCODERS[self._encoding]()
+            start = self._encoded_start()
+            headers = MutableHeaders(scope=start)
+            if more_body:
+                # Tamanho final desconhecido: chunked
+                del headers["content-length"]
+            else:
+                compressed = await _run(lambda data: self._encoder.compress(data) + self._encoder.finish(), body)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(start)
+
+        chunk = await _run(self._encoder.compress, body) if body else b""
+        if not more_body:
+            chunk += self._encoder.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
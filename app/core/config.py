@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
@@ -25,8 +25,131 @@ class Settings(BaseSettings):
     
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 
+
+    # Implementação de JWT ('pyjwt' requer `pip install pyjwt`) e cache de tokens já verificados
+    JWT_BACKEND: Literal['jose', 'pyjwt'] = 'jose'
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+
+    # Vários workers do uvicorn: caches com tier compartilhado no Mongo (cache_entries) e
+    # invalidação entre workers pela coleção capped cache_events. Combine com RATE_LIMIT_BACKEND='mongo'
+    MULTI_WORKER: bool = False
+    CACHE_EVENTS_SIZE_BYTES: int = 16 * 1024 * 1024
+
+    # Cache de usuários autenticados (get_current_user)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Limite de tentativas de login/cadastro (token bucket por IP e por e-mail, formato 'N/periodo')
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal['memory', 'mongo'] = 'memory'  # 'mongo': buckets compartilhados entre workers
+    RATE_LIMIT_LOGIN_PER_IP: str = '30/minute'
+    RATE_LIMIT_LOGIN_PER_EMAIL: str = '10/minute'
+    RATE_LIMIT_SIGNUP_PER_IP: str = '20/minute'
+    RATE_LIMIT_SIGNUP_PER_EMAIL: str = '5/minute'
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Use o X-Forwarded-For só atrás de um proxy confiável
+
+    # Hashing de senhas (bcrypt) fora do event loop
+    PASSWORD_HASH_ROUNDS: int = 12  # Fator de custo do bcrypt (cada +1 dobra o tempo)
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4  # Chamadas além disso aguardam na fila
     
+    # Máximo de itens por requisição nos endpoints /tasks/bulk
+    BULK_MAX_ITEMS: int = 500
+
+    # Tamanho máximo de página em GET /tasks/ (`limit`)
+    LIST_MAX_LIMIT: int = 100
+
+    # Compressão das respostas (gzip; br e zstd se os pacotes 'brotli'/'zstandard' estiverem instalados)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_ENCODINGS: List[Literal['zstd', 'br', 'gzip']] = ['zstd', 'br', 'gzip']  # Ordem de preferência
+    COMPRESSION_MINIMUM_SIZE: int = 1_024  # Corpos menores seguem sem compressão
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_THREAD_THRESHOLD: int = 256 * 1_024  # Blocos maiores são comprimidos em thread
+
+    # Agendador de jobs de manutenção (lifespan). Cada worker roda o seu; o jitter espalha as
+    # execuções entre workers e o desligamento aguarda os jobs em andamento até o timeout
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_JITTER_SECONDS: float = 30.0
+    SCHEDULER_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    CACHE_PURGE_INTERVAL_SECONDS: int = 60  # Remove entradas expiradas dos caches em processo
+    INDEX_CHECK_CRON: str = '0 3 * * *'  # Verificação diária dos índices (UTC)
+
+    # Arquivamento: tarefas concluídas/removidas há mais tempo que isso saem da coleção principal
+    # para tasks_archive, onde expiram pelo índice TTL (mudar a retenção exige um collMod no índice)
+    ARCHIVE_ENABLED: bool = True  # Job 'archive_tasks' do agendador
+    ARCHIVE_COMPLETED_AFTER_DAYS: int = 30
+    ARCHIVE_DELETED_AFTER_DAYS: int = 1
+    ARCHIVE_RETENTION_DAYS: int = 365
+    ARCHIVE_INTERVAL_SECONDS: int = 3_600
+    ARCHIVE_BATCH_SIZE: int = 1_000
+
+    # Exportação em streaming: documentos por lote do cursor (e por bloco enviado ao cliente)
+    EXPORT_BATCH_SIZE: int = 1_000
+
+    # Importação NDJSON: tarefas por insert_many, erros listados na resposta e tamanho máximo da linha
+    IMPORT_CHUNK_SIZE: int = 1_000
+    IMPORT_MAX_ERRORS: int = 100
+    IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+
+    # Stream de alterações (/tasks/stream): fila por conexão, eventos guardados para retomada
+    # com Last-Event-ID e intervalo dos keepalives
+    CHANGEFEED_QUEUE_SIZE: int = 100
+    CHANGEFEED_HISTORY_SIZE: int = 1_000
+    CHANGEFEED_HEARTBEAT_SECONDS: int = 15
+
+    # Cache das categorias de cada usuário (validação de posse nas tarefas e listagem)
+    CATEGORY_CACHE_TTL_SECONDS: int = 300
+    CATEGORY_CACHE_MAX_SIZE: int = 10_000
+
+    # ETags por versão das coleções do usuário (If-None-Match -> 304 sem consultar o banco).
+    # Sem MULTI_WORKER, o TTL limita a defasagem entre workers, que não compartilham as versões.
+    ETAG_VERSION_TTL_SECONDS: int = 30
+    ETAG_REGISTRY_MAX_SIZE: int = 100_000
+
+    # Cache das estatísticas de /tasks/stats (invalidado a cada escrita de tarefas do usuário)
+    STATS_CACHE_TTL_SECONDS: int = 30
+    STATS_CACHE_MAX_SIZE: int = 10_000
+    STATS_MAX_DAYS: int = 365  # Janela máxima da contagem por dia
+
+    # Preenche os campos de busca de tarefas gravadas sem eles (anteriores à busca ou escritas
+    # por workers antigos durante o deploy): na subida e depois periodicamente. É idempotente.
+    SEARCH_BACKFILL_ENABLED: bool = True
+    SEARCH_BACKFILL_INTERVAL_SECONDS: int = 3600
+
     BACKEND_CORS_ORIGINS: List[str] = []
     MONGO_CONNECTION_STRING: str 
+
+    # Pool de conexões do Motor (dimensione contra o número de workers do uvicorn)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0  # Conexões abertas já na subida (warmup)
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # Espera máxima por uma conexão livre
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30_000
+    MONGO_CONNECT_TIMEOUT_MS: int = 20_000
+    MONGO_COMPRESSORS: List[Literal['zstd', 'snappy', 'zlib']] = []
+    MONGO_READ_PREFERENCE: Literal[
+        'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'
+    ] = 'primary'
+    # Preferência por rota (nome do endpoint: list_tasks, get_task, task_stats, list_categories,
+    # get_current_user), ex.: {"list_tasks": "secondaryPreferred"}. As demais usam MONGO_READ_PREFERENCE
+    MONGO_ROUTE_READ_PREFERENCES: Dict[str, Literal[
+        'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'
+    ]] = {}
+    MONGO_MAX_STALENESS_SECONDS: int = -1  # -1: sem limite; senão, no mínimo 90
+
+    # Sessão causal por requisição: leituras em secundários enxergam as escritas do próprio usuário,
+    # mesmo em requisições seguintes (o ponto da última escrita vale por CAUSAL_TOKEN_TTL_SECONDS)
+    CAUSAL_CONSISTENCY_ENABLED: bool = True
+    CAUSAL_TOKEN_TTL_SECONDS: int = 300
+
+    # Token exigido em /metrics (Authorization: Bearer). Sem ele, os endpoints de métricas respondem 404
+    METRICS_TOKEN: Optional[str] = None
+
+    # Instrumentação: cabeçalho Server-Timing nas respostas e log de consultas lentas
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_QUERY_MS: int = 100
         
 settings = Settings()
\ No newline at end of file
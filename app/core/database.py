@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Type
+from uuid import UUID
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo import monitoring
+from pymongo.read_preferences import (
+    Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred, _ServerMode
+)
+
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.instrumentation import command_listener
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Coleta estatísticas do pool de conexões a partir dos eventos CMAP do PyMongo.
+    Os eventos chegam das threads do executor do Motor, por isso o lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiters = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.pool_clears = 0
+
+    # Pool
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    # Conexões
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event): pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    # Checkout: o início e o fim acontecem na mesma thread, o que permite medir a espera
+    def connection_check_out_started(self, event):
+        self._local.started_at = time.perf_counter()
+        with self._lock:
+            self.waiters += 1
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, "started_at", time.perf_counter())
+        with self._lock:
+            self.waiters -= 1
+            self.checked_out += 1
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiters -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+                "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "waiters": self.waiters,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": (self.total_wait_seconds / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_stats = PoolStatsListener()
+
+# Cliente criado no lifespan; fica acessível para quem precisar do Motor fora do Beanie
+db_client: Optional[AsyncIOMotorClient] = None
+
+
+def create_client() -> AsyncIOMotorClient:
+    """
+    Cria o cliente Motor com as opções de pool definidas em Settings.
+    """
+    global db_client
+
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+        "event_listeners": [pool_stats, command_listener],
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = ",".join(settings.MONGO_COMPRESSORS)
+
+    db_client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING, **options)
+    return db_client
+
+
+async def warm_pool(client: AsyncIOMotorClient, size: int) -> None:
+    """
+    Abre `size` conexões na subida com pings simultâneos, para que as primeiras
+    requisições não paguem o handshake (TCP/TLS/autenticação).
+    """
+    if size > 0:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(size)))
+
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference(route: str) -> _ServerMode:
+    """
+    Preferência de leitura da rota (MONGO_ROUTE_READ_PREFERENCES), ou a padrão do cliente.
+    """
+    mode = settings.MONGO_ROUTE_READ_PREFERENCES.get(route, settings.MONGO_READ_PREFERENCE)
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCES[mode](max_staleness=settings.MONGO_MAX_STALENESS_SECONDS)
+
+
+def routed_collection(model: Type[Document], route: str) -> AsyncIOMotorCollection:
+    """
+    Coleção do modelo com a preferência de leitura da rota. Use junto com db_session(),
+    para que leituras em secundários respeitem as escritas do próprio usuário.
+    """
+    return model.get_motor_collection().with_options(read_preference=read_preference(route))
+
+
+# Sessão causal da requisição atual (aberta pela dependência causal_session)
+current_session: ContextVar[Optional[AsyncIOMotorClientSession]] = ContextVar("current_session", default=None)
+
+# Último operationTime/clusterTime das escritas de cada usuário. Compartilhado entre workers
+# com MULTI_WORKER: a próxima requisição, em qualquer worker, lê a partir desse ponto.
+# catch_up roda em toda requisição autenticada: a ausência de escrita recente fica registrada
+# localmente (até a próxima gravação publicada), para não consultar cache_entries a cada vez
+causal_tokens = Cache(
+    "causal_tokens",
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.CAUSAL_TOKEN_TTL_SECONDS,
+    shared=True,
+    miss_ttl=settings.CAUSAL_TOKEN_TTL_SECONDS
+)
+
+
+def db_session() -> Optional[AsyncIOMotorClientSession]:
+    return current_session.get()
+
+
+async def catch_up(owner: UUID) -> None:
+    """
+    Avança a sessão da requisição até a última escrita do usuário (read-your-writes entre requisições).
+    """
+    session = db_session()
+    if session is None:
+        return
+    token = await causal_tokens.get(owner)
+    if token is not None:
+        session.advance_cluster_time(token["cluster_time"])
+        session.advance_operation_time(token["operation_time"])
+
+
+async def remember_writes(owner: UUID) -> None:
+    """
+    Guarda o ponto da última escrita feita na sessão da requisição. Em servidor standalone
+    não há operationTime, e nada é guardado.
+    """
+    session = db_session()
+    if session is None or session.operation_time is None or session.cluster_time is None:
+        return
+    await causal_tokens.set(owner, {"cluster_time": session.cluster_time, "operation_time": session.operation_time})
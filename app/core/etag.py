@@ -0,0 +1,74 @@
+import hashlib
+from typing import Hashable, Optional
+from uuid import uuid4
+
+from fastapi import Request, Response, status
+
+from app.core.cache import Cache
+from app.core.config import settings
+
+
+class VersionRegistry:
+    """
+    Versão por (escopo, owner) das coleções do usuário, usada para montar ETags sem
+    consultar o banco. Cada escrita descarta a versão; a leitura seguinte sorteia uma nova.
+
+    Com MULTI_WORKER as versões ficam no tier compartilhado e as trocas são publicadas
+    aos demais workers. Sem ele, a versão é local ao processo e o TTL limita por quanto
+    tempo outro worker, que não viu a escrita, ainda pode responder 304.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._versions = Cache("etag_versions", maxsize=maxsize, ttl=ttl, shared=True)
+
+    async def current(self, scope: str, owner: Hashable) -> str:
+        return await self._versions.setdefault((scope, owner), uuid4().hex[:16])
+
+    async def bump(self, scope: str, owner: Hashable) -> None:
+        await self._versions.invalidate((scope, owner))
+
+    def purge_expired(self) -> int:
+        return self._versions.purge_expired()
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+
+versions = VersionRegistry(
+    maxsize=settings.ETAG_REGISTRY_MAX_SIZE,
+    ttl=settings.ETAG_VERSION_TTL_SECONDS
+)
+
+
+async def make_etag(scope: str, owner: Hashable, request: Request) -> str:
+    """
+    ETag forte: versão das coleções do usuário + hash do path e da query string
+    (a representação depende de filtros, paginação e `fields=`).
+    Deve ser calculada antes da consulta, para que uma escrita concorrente nunca
+    fique associada a um ETag antigo.
+    """
+    digest = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'"{await versions.current(scope, owner)}-{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparação fraca: W/"x" equivale a "x"
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Resposta 304 (sem corpo) se o cliente já tem a representação atual; None caso contrário.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    return None
+
+
+def etag_headers(etag: str) -> dict:
+    # no-cache: o cliente pode guardar, mas revalida sempre (If-None-Match)
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
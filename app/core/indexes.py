@@ -0,0 +1,82 @@
+import logging
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from beanie import Document
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Opções que, se divergentes, mudam o comportamento do índice
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+IndexKey = Tuple[Tuple[str, Any], ...]
+
+
+def _normalize_key(key: Any) -> IndexKey:
+    items = key.items() if hasattr(key, "items") else key
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in items
+    )
+
+
+def _options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {opt: spec[opt] for opt in COMPARED_OPTIONS if spec.get(opt) not in (None, False)}
+
+
+def declared_indexes(model: Type[Document]) -> Dict[IndexKey, Dict[str, Any]]:
+    """
+    Índices declarados no modelo: campos com Indexed(...) e Settings.indexes.
+    """
+    declared: Dict[IndexKey, Dict[str, Any]] = {}
+
+    for name, field in get_model_fields(model).items():
+        attrs = get_index_attributes(field)
+        if attrs is not None:
+            index = IndexModel([(field.alias or name, attrs[0])], **attrs[1])
+            declared[_normalize_key(index.document["key"])] = _options(index.document)
+
+    for index in model.get_settings().indexes or []:
+        # Após o init_beanie, os itens de Settings.indexes viram IndexModelField
+        index = getattr(index, "index", index)
+        if not isinstance(index, IndexModel):
+            index = IndexModel(index)
+        declared[_normalize_key(index.document["key"])] = _options(index.document)
+
+    return declared
+
+
+async def verify_indexes(models: Sequence[Type[Document]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compara os índices existentes no MongoDB com os declarados nos modelos.
+    Retorna, por coleção, os índices ausentes, inesperados e com opções divergentes,
+    e registra um aviso quando há qualquer divergência.
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+
+    for model in models:
+        collection = model.get_motor_collection()
+        declared = declared_indexes(model)
+
+        live: Dict[IndexKey, Tuple[str, Dict[str, Any]]] = {}
+        for name, spec in (await collection.index_information()).items():
+            if name == "_id_":
+                continue
+            live[_normalize_key(spec["key"])] = (name, _options(spec))
+
+        missing = [str(list(key)) for key in declared if key not in live]
+        unexpected = [name for key, (name, _) in live.items() if key not in declared]
+        mismatched = [
+            name for key, (name, options) in live.items()
+            if key in declared and options != declared[key]
+        ]
+
+        drift = {"missing": missing, "unexpected": unexpected, "mismatched": mismatched}
+        report[collection.name] = drift
+
+        if missing or unexpected or mismatched:
+            logger.warning("Divergência de índices na coleção '%s': %s", collection.name, drift)
+
+    return report
@@ -0,0 +1,304 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Comandos de handshake/autenticação/monitoramento, que não interessam às métricas
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+    "authenticate", "getnonce", "endSessions", "buildInfo", "buildinfo",
+})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """
+    Histograma no formato de exposição do Prometheus (buckets cumulativos, _sum e _count).
+    Observado tanto do event loop quanto das threads do Motor, por isso o lock.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            # [contagem por bucket..., soma, total]
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in self._series.items():
+                for bound, count in zip(self.buckets, series):
+                    le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP por rota.", ("method", "route", "status")
+)
+command_duration = Histogram(
+    "mongodb_command_duration_seconds", "Duração dos comandos enviados ao MongoDB.", ("command", "collection")
+)
+documents_returned = Counter(
+    "mongodb_documents_returned_total", "Documentos retornados pelo MongoDB.", ("command", "collection")
+)
+job_duration = Histogram(
+    "scheduler_job_duration_seconds", "Duração das execuções dos jobs agendados.", ("job", "outcome"),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+METRICS = (request_duration, command_duration, documents_returned, job_duration)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """
+    Tempos acumulados por etapa (jwt, user, db, serialize...) de uma requisição.
+    O Motor copia o contexto para as threads do executor, então o CommandListener
+    enxerga o mesmo objeto que o event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: Dict[str, List[float]] = {}  # etapa -> [segundos, ocorrências]
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total: float) -> str:
+        with self._lock:
+            parts = [
+                f'{name};dur={seconds * 1000:.2f};desc="{count}x"'
+                for name, (seconds, count) in self.entries.items()
+            ]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Mede o bloco e soma o tempo à etapa `name` da requisição corrente (se houver uma).
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, perf_counter() - start)
+
+
+def filter_shape(value: Any) -> Any:
+    """
+    Formato de um filtro/pipeline com os valores trocados por '?', para agrupar
+    consultas iguais no log sem expor dados dos usuários.
+    """
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def _collection(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return command.get("collection", "-")
+    target = command.get(command_name)
+    return target if isinstance(target, str) else "-"
+
+
+def _command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    if command_name == "find":
+        return command.get("filter", {})
+    if command_name in ("findAndModify", "count", "distinct"):
+        return command.get("query", {})
+    if command_name == "aggregate":
+        return command.get("pipeline", [])
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return statements[0].get("q", {})
+    return None
+
+
+def _documents_returned(command_name: str, reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return 0
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """
+    Registra a duração de cada comando do MongoDB, a coleção e os documentos retornados;
+    soma o tempo ao Server-Timing da requisição e loga as consultas lentas (SLOW_QUERY_MS).
+    Os eventos de um comando chegam na mesma thread; o dict de pendentes só usa operações
+    atômicas (setitem/pop).
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Dict[str, Any]]] = {}
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (
+            _collection(event.command_name, event.command), event.command
+        )
+
+    def succeeded(self, event):
+        self._finish(event, _documents_returned(event.command_name, event.reply))
+
+    def failed(self, event):
+        self._finish(event, 0)
+
+    def _finish(self, event, documents: int) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, command = pending
+        seconds = event.duration_micros / 1_000_000
+
+        command_duration.observe(seconds, event.command_name, collection)
+        if documents:
+            documents_returned.inc(documents, event.command_name, collection)
+
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add("db", seconds)
+
+        if seconds * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "Consulta lenta: %s em %s levou %.1f ms (%d documentos). Formato: %s",
+                event.command_name, collection, seconds * 1000, documents,
+                json.dumps(filter_shape(_command_filter(event.command_name, command)))
+            )
+
+
+command_listener = CommandTimingListener()
+
+
+class TimingMiddleware:
+    """
+    Middleware ASGI puro: mede cada requisição, envia o cabeçalho Server-Timing com
+    as etapas coletadas e alimenta o histograma por rota (template do path, não o path real).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: Optional[Dict[Any, str]] = None
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.header(perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            request_duration.observe(perf_counter() - start, scope["method"], self._route(scope), str(status_code))
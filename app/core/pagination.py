@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, doc_id: UUID) -> str:
+    """
+    Gera um cursor opaco a partir da chave de ordenação (created_at, _id) do último item da página.
+    """
+    raw = json.dumps([created_at.isoformat(), str(doc_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Inverso de encode_cursor. Levanta ValueError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(doc_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+
+
+def keyset_filter(created_at: datetime, doc_id: UUID) -> Dict[str, Any]:
+    """
+    Filtro que retorna os documentos estritamente após (created_at, _id) na ordem ascendente.
+    """
+    return {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": doc_id}},
+        ]
+    }
@@ -0,0 +1,158 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Protocol, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+
+from app.core import database
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Token bucket: até `capacity` requisições de uma vez, recarregando `capacity` a cada `period` segundos.
+    """
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        Lê limites no formato 'N/periodo' (ex.: '10/minute'), com N >= 1.
+        """
+        try:
+            count, period = value.split("/")
+            if int(count) < 1:
+                raise ValueError
+            return cls(capacity=int(count), period=PERIODS[period.strip()])
+        except (KeyError, ValueError):
+            raise ValueError(f"Limite inválido: {value!r} (use 'N/second|minute|hour|day', com N >= 1)")
+
+
+class RateLimitBackend(Protocol):
+    """
+    Armazena os buckets. O backend em memória vale por processo; para limitar entre
+    workers, registre um backend compartilhado em RATE_LIMIT_BACKENDS e ajuste RATE_LIMIT_BACKEND.
+    """
+
+    async def consume(self, key: str, limit: RateLimit) -> float:
+        """Retira um token do bucket. Retorna 0 se permitido, senão os segundos até haver um token."""
+        ...
+
+    async def reset(self) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class MemoryRateLimitBackend:
+    """
+    Buckets em um dict: chave -> (tokens, atualizado_em, cheio_em). Um bucket cheio equivale
+    a um bucket inexistente, então a varredura periódica remove os que já recarregaram.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self.rejected = 0
+
+    def _sweep(self, now: float) -> None:
+        self._last_sweep = now
+        expired = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in expired:
+            del self._buckets[key]
+
+    async def consume(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        if now - self._last_sweep >= self._sweep_interval:
+            self._sweep(now)
+
+        tokens, updated_at, _ = self._buckets.get(key, (limit.capacity, now, now))
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+
+        if tokens < 1:
+            self.rejected += 1
+            self._buckets[key] = (tokens, now, now + (limit.capacity - tokens) / limit.rate)
+            return (1 - tokens) / limit.rate
+
+        tokens -= 1
+        self._buckets[key] = (tokens, now, now + (limit.capacity - tokens) / limit.rate)
+        return 0.0
+
+    async def reset(self) -> None:
+        self._buckets.clear()
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "buckets": len(self._buckets), "rejected": self.rejected}
+
+
+class MongoRateLimitBackend:
+    """
+    Buckets na coleção rate_limits, compartilhados entre workers. Cada consumo é um único
+    find_one_and_update com pipeline (recarga, decisão e débito atômicos, com o relógio do
+    servidor). O índice TTL em expires_at (momento em que o bucket estaria cheio) faz o papel
+    da varredura do backend em memória.
+    """
+
+    def __init__(self, collection=None):
+        # Sem coleção explícita, usa o banco padrão do cliente criado no lifespan
+        self._collection = collection
+        self._indexed = False
+        self.rejected = 0
+
+    async def _get_collection(self):
+        if self._collection is None:
+            self._collection = database.db_client.get_default_database()["rate_limits"]
+        if not self._indexed:
+            await self._collection.create_index(
+                [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+            )
+            self._indexed = True
+        return self._collection
+
+    @staticmethod
+    def _pipeline(limit: RateLimit) -> List[Dict[str, Any]]:
+        elapsed = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+        refilled = {"$add": [{"$ifNull": ["$tokens", limit.capacity]}, {"$multiply": [elapsed, limit.rate]}]}
+        allowed = {"$gte": ["$tokens", 1]}
+        return [
+            {"$set": {"tokens": {"$min": [limit.capacity, refilled]}, "updated_at": "$$NOW"}},
+            {"$set": {"allowed": allowed, "tokens": {"$cond": [allowed, {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            {"$set": {"expires_at": {"$add": [
+                "$updated_at", {"$multiply": [{"$divide": [{"$subtract": [limit.capacity, "$tokens"]}, limit.rate]}, 1000]}
+            ]}}},
+        ]
+
+    async def consume(self, key: str, limit: RateLimit) -> float:
+        collection = await self._get_collection()
+        bucket = await collection.find_one_and_update(
+            {"_id": key}, self._pipeline(limit), upsert=True, return_document=ReturnDocument.AFTER
+        )
+        if bucket["allowed"]:
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket["tokens"]) / limit.rate
+
+    async def reset(self) -> None:
+        collection = await self._get_collection()
+        await collection.delete_many({})
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "mongo", "rejected": self.rejected}
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryRateLimitBackend,
+    "mongo": MongoRateLimitBackend,
+}
+
+rate_limit_backend: RateLimitBackend = RATE_LIMIT_BACKENDS[settings.RATE_LIMIT_BACKEND]()
@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+import logging
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set
+
+from app.core.config import settings
+from app.core.instrumentation import job_duration
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Any]
+
+
+class Trigger(Protocol):
+    def next_after(self, after: datetime) -> datetime:
+        """Próximo horário de execução estritamente depois de `after` (UTC)."""
+        ...
+
+
+@dataclass(frozen=True)
+class IntervalTrigger:
+    seconds: float
+
+    def __post_init__(self):
+        if self.seconds <= 0:
+            raise ValueError("O intervalo deve ser maior que zero")
+
+    def next_after(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class CronTrigger:
+    """
+    Expressão cron de 5 campos em UTC: 'minuto hora dia mês dia-da-semana'.
+    Aceita '*', números, listas (1,15), faixas (1-5) e passos (*/10, 0-30/5).
+    Dia da semana: 0 ou 7 = domingo. Como no cron, se dia e dia-da-semana forem
+    restritos, basta um deles casar.
+    """
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expressão cron inválida: {expression!r} (esperados 5 campos)")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(part, low, high) for part, (low, high) in zip(parts, self.RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        try:
+            for item in part.split(","):
+                spec, _, step = item.partition("/")
+                if spec == "*":
+                    start, end = low, high
+                elif "-" in spec:
+                    start, end = (int(v) for v in spec.split("-"))
+                else:
+                    start = end = int(spec)
+                    if step:
+                        end = high
+                if not low <= start <= end <= high:
+                    raise ValueError
+                values.update(range(start, end + 1, int(step) if step else 1))
+        except ValueError:
+            raise ValueError(f"Campo cron inválido: {part!r} (faixa {low}-{high})")
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Avança por mês/dia/hora inteiros quando o campo não casa: poucas iterações por chamada
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"A expressão cron {self.expression!r} nunca é satisfeita")
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    trigger: Trigger
+    jitter: float = 0.0
+    max_instances: int = 1
+    run_on_start: bool = False
+    # Estado e contadores (expostos em /metrics/jobs)
+    running: Set[asyncio.Task] = field(default_factory=set)
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    next_run_at: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "trigger": str(self.trigger),
+            "running": len(self.running),
+            "max_instances": self.max_instances,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "next_run_at": self.next_run_at,
+            "last_started_at": self.last_started_at,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Agendador asyncio iniciado no lifespan. Cada job tem um laço próprio que dorme até a
+    próxima execução (mais um atraso aleatório de até `jitter` segundos, para que vários
+    workers não disparem juntos) e roda o job em uma task separada, fora do caminho das
+    requisições. Execuções além de `max_instances` simultâneas são puladas e contadas.
+    Funções síncronas rodam em thread, para não bloquear o event loop; jobs assíncronos
+    longos devem ceder o loop entre lotes (ver ArchiveService.archive_tasks).
+    Cada worker do uvicorn tem o seu agendador: os jobs precisam ser idempotentes.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._loops: List[asyncio.Task] = []
+
+    @property
+    def started(self) -> bool:
+        return bool(self._loops)
+
+    def add_job(self, name: str, func: JobFunc, *, every: Optional[float] = None, cron: Optional[str] = None,
+                jitter: float = 0.0, max_instances: int = 1, run_on_start: bool = False) -> Job:
+        if (every is None) == (cron is None):
+            raise ValueError("Informe exatamente um de 'every' ou 'cron'")
+        if name in self._jobs:
+            raise ValueError(f"Job já registrado: {name}")
+        if max_instances < 1:
+            raise ValueError("max_instances deve ser ao menos 1")
+        trigger = IntervalTrigger(every) if every is not None else CronTrigger(cron)
+        job = Job(name, func, trigger, jitter=jitter, max_instances=max_instances, run_on_start=run_on_start)
+        self._jobs[name] = job
+        if self.started:
+            self._loops.append(asyncio.create_task(self._loop(job), name=f"scheduler:{name}"))
+        return job
+
+    def start(self) -> None:
+        if self.started:
+            return
+        for job in self._jobs.values():
+            self._loops.append(asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}"))
+
+    async def _loop(self, job: Job) -> None:
+        next_run = datetime.now(UTC) if job.run_on_start else job.trigger.next_after(datetime.now(UTC))
+        while True:
+            job.next_run_at = next_run
+            delay = (next_run - datetime.now(UTC)).total_seconds() + random.uniform(0, job.jitter)
+            await asyncio.sleep(max(delay, 0))
+
+            if len(job.running) >= job.max_instances:
+                job.skipped += 1
+                logger.warning("Job %s ainda em execução; execução de %s pulada.", job.name, next_run)
+            else:
+                run = asyncio.create_task(self._run(job), name=f"job:{job.name}")
+                job.running.add(run)
+                run.add_done_callback(job.running.discard)
+
+            # Execuções perdidas (job lento, loop ocupado) não são acumuladas
+            next_run = job.trigger.next_after(max(next_run, datetime.now(UTC)))
+
+    async def _run(self, job: Job) -> None:
+        job.last_started_at = datetime.now(UTC)
+        started = perf_counter()
+        outcome = "success"
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                result = await asyncio.to_thread(job.func)
+                if inspect.isawaitable(result):
+                    await result
+            job.last_error = None
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "failure"
+            job.failures += 1
+            job.last_error = repr(e)
+            logger.exception("Falha no job %s", job.name)
+        finally:
+            job.runs += 1
+            job.last_duration = perf_counter() - started
+            job_duration.observe(job.last_duration, job.name, outcome)
+
+    async def run_now(self, name: str) -> None:
+        """
+        Executa o job imediatamente e aguarda o fim (útil em testes e tarefas administrativas).
+        """
+        await self._run(self._jobs[name])
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Para de agendar novas execuções e aguarda as em andamento por até `timeout`
+        segundos (SCHEDULER_SHUTDOWN_TIMEOUT_SECONDS); as que passarem disso são canceladas.
+        """
+        timeout = settings.SCHEDULER_SHUTDOWN_TIMEOUT_SECONDS if timeout is None else timeout
+        for loop in self._loops:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops.clear()
+
+        running = [run for job in self._jobs.values() for run in job.running]
+        if not running:
+            return
+        _, pending = await asyncio.wait(running, timeout=timeout)
+        for run in pending:
+            logger.warning("Job %s cancelado no desligamento.", run.get_name())
+            run.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def clear(self) -> None:
+        """Remove os jobs registrados (o agendador precisa estar parado)."""
+        if self.started:
+            raise RuntimeError("Pare o agendador antes de remover os jobs")
+        self._jobs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self.started, "jobs": {name: job.stats() for name, job in self._jobs.items()}}
+
+
+scheduler = Scheduler()
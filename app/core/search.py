@@ -0,0 +1,76 @@
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+# Tamanho mínimo e máximo dos prefixos indexados (edge n-grams)
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 15
+
+# Peso dos termos encontrados no título em relação aos da descrição
+TITLE_WEIGHT = 2
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Minúsculas e sem acentos, para que 'Reunião' e 'reuniao' casem.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(normalize(text))
+
+
+def edge_ngrams(text: str) -> List[str]:
+    """
+    Todos os prefixos (entre MIN e MAX caracteres) de cada palavra do texto.
+    'Comprar leite' -> ['co', 'com', ..., 'comprar', 'le', 'lei', ...]
+    """
+    grams = set()
+    for word in tokenize(text):
+        for size in range(MIN_PREFIX_LENGTH, min(len(word), MAX_PREFIX_LENGTH) + 1):
+            grams.add(word[:size])
+    return sorted(grams)
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Converte a busca do usuário nos termos a procurar no índice.
+    Cada palavra funciona como prefixo. Levanta ValueError se não sobrar nenhum termo útil.
+    """
+    terms = {word[:MAX_PREFIX_LENGTH] for word in tokenize(query) if len(word) >= MIN_PREFIX_LENGTH}
+    if not terms:
+        raise ValueError(f"A busca precisa de ao menos um termo com {MIN_PREFIX_LENGTH} caracteres")
+    return sorted(terms)
+
+
+def search_fields(title: str, description: str) -> Dict[str, List[str]]:
+    """
+    Campos de busca mantidos no documento da tarefa.
+    'search_terms' (título + descrição) é o campo indexado; os outros dois servem ao ranking.
+    """
+    title_terms = edge_ngrams(title)
+    description_terms = edge_ngrams(description)
+    return {
+        "title_terms": title_terms,
+        "description_terms": description_terms,
+        "search_terms": sorted(set(title_terms) | set(description_terms)),
+    }
+
+
+def ranking_pipeline(terms: List[str]) -> List[Dict[str, Any]]:
+    """
+    Estágios de agregação que pontuam e ordenam os resultados por relevância.
+    Termos que aparecem no título valem TITLE_WEIGHT; na descrição, 1.
+    Empates ficam com as tarefas mais recentes.
+    """
+    return [
+        {"$addFields": {"_score": {"$add": [
+            {"$multiply": [TITLE_WEIGHT, {"$size": {"$setIntersection": ["$title_terms", terms]}}]},
+            {"$size": {"$setIntersection": ["$description_terms", terms]}},
+        ]}}},
+        {"$sort": {"_score": -1, "created_at": -1, "_id": 1}},
+    ]
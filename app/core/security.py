@@ -1,10 +1,22 @@
+import asyncio
+import functools
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+from jose import jwt, JWTError
 from app.core.config import settings # Importa as configurações do Pydantic V2
+from app.core.cache import TTLCache
 
 # Configuração do contexto de criptografia
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
 
 def hash_password(password: str) -> str:
     if not password:
@@ -14,6 +26,178 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_context.verify(plain_password, hashed_password)
 
+
+class PasswordHasherPool:
+    """
+    Executa o bcrypt em um pool de threads ou processos, com limite de concorrência.
+    Chamadas acima do limite esperam em fila sem bloquear o event loop.
+    """
+
+    def __init__(self, executor_kind: str, max_workers: int, max_concurrency: int):
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # O semáforo fica preso ao loop em que foi usado; recria se o loop mudou (ex.: testes)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        semaphore = self._get_semaphore()
+
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.total_wait_seconds += time.perf_counter() - queued_at
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_ms": (self.total_wait_seconds / self.completed * 1000) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    executor_kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY
+)
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+class InvalidTokenError(Exception):
+    """Token malformado, expirado ou com assinatura inválida."""
+
+
+class TokenBackend(Protocol):
+    """
+    Implementação de JWT usada pela aplicação. Trocar de biblioteca é só registrar
+    um novo backend em TOKEN_BACKENDS e ajustar JWT_BACKEND; os handlers não mudam.
+    """
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str: ...
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]: ...
+
+
+class JoseTokenBackend:
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            return jwt.decode(token, key, algorithms=algorithms)
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+class PyJWTTokenBackend:
+    def __init__(self):
+        try:
+            import jwt as pyjwt
+        except ImportError as e:
+            raise RuntimeError("JWT_BACKEND='pyjwt' requer o pacote 'pyjwt' instalado") from e
+        self._jwt = pyjwt
+
+    def encode(self, claims: Dict[str, Any], key: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, key, algorithms=algorithms)
+        except self._jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+TOKEN_BACKENDS = {
+    "jose": JoseTokenBackend,
+    "pyjwt": PyJWTTokenBackend,
+}
+
+token_backend: TokenBackend = TOKEN_BACKENDS[settings.JWT_BACKEND]()
+
+# Claims de tokens já verificados, indexadas pelo digest do token; cada entrada vive até o 'exp'
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+def decode_token(token: str, secret_key: str) -> Dict[str, Any]:
+    """
+    Verifica o token e retorna suas claims, consultando antes o cache de tokens verificados.
+    Levanta InvalidTokenError se o token não for válido.
+    """
+    # A chave entra no digest para que access e refresh tokens nunca se confundam
+    cache_key = hashlib.sha256(secret_key.encode() + b"\0" + token.encode()).digest()
+    claims = token_cache.get(cache_key)
+    if claims is not None:
+        return claims
+
+    claims = token_backend.decode(token, secret_key, algorithms=[settings.ALGORITHM])
+
+    # Sem 'exp' não há como limitar a validade da entrada; nesse caso não cacheamos
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(cache_key, claims, ttl=remaining)
+    return claims
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    return decode_token(token, settings.JWT_SECRET_KEY)
+
+def decode_refresh_token(token: str) -> Dict[str, Any]:
+    return decode_token(token, settings.JWT_REFRESH_SECRET_KEY)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     # Padrão 2026: UTC para evitar problemas de fuso horário
@@ -21,7 +205,7 @@ def create_access_token(data: dict):
     
     to_encode.update({"exp": expire})
     
-    encoded_jwt = jwt.encode(
+    encoded_jwt = token_backend.encode(
         to_encode, 
         settings.JWT_SECRET_KEY, 
         algorithm=settings.ALGORITHM
@@ -35,7 +219,7 @@ def create_refresh_token(data: dict):
     
     to_encode.update({"exp": expire})
     
-    encoded_jwt = jwt.encode(
+    encoded_jwt = token_backend.encode(
         to_encode, 
         settings.JWT_REFRESH_SECRET_KEY, 
         algorithm=settings.ALGORITHM
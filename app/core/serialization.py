@@ -0,0 +1,120 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Type
+from uuid import UUID
+
+import orjson
+from bson import Binary
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.core.instrumentation import timed
+
+
+def parse_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Converte o parâmetro `fields=a,b,c` em uma tupla de campos do schema de saída.
+    Levanta ValueError para campos desconhecidos.
+    """
+    if not fields:
+        return None
+    selected = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in schema.model_fields]
+    if unknown or not selected:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(unknown) or fields}. "
+            f"Disponíveis: {', '.join(schema.model_fields)}"
+        )
+    return selected
+
+
+def projection_for(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Dict[str, int]:
+    """
+    Projeção do MongoDB com os campos do schema de saída (respeitando o alias '_id'),
+    ou só com `fields` (ver parse_fields).
+    """
+    projection = {}
+    for name, field in schema.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+        alias = field.validation_alias if isinstance(field.validation_alias, str) else field.alias
+        projection[alias or name] = 1
+    return projection
+
+
+def as_uuid(value: Any) -> UUID:
+    """
+    UUID de um valor lido direto do Motor (Binary subtipo 4 ou UUID, conforme o uuidRepresentation).
+    """
+    return value.as_uuid() if isinstance(value, Binary) else UUID(str(value))
+
+
+def _bson_default(value: Any) -> Any:
+    # UUIDs chegam do Motor como Binary subtipo 4
+    if isinstance(value, Binary) and value.subtype == 4:
+        return value.as_uuid()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_bson(content: Any) -> bytes:
+    """
+    JSON (bytes) de documentos brutos do Motor, convertendo os tipos BSON que o orjson não conhece.
+    """
+    return orjson.dumps(content, default=_bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def prepare_documents(
+    docs: Iterable[Dict[str, Any]],
+    fields: Optional[Tuple[str, ...]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ajusta documentos brutos do Motor ao formato da API: '_id' passa a se chamar 'id'.
+    Com `fields`, remove o que foi lido só para uso interno (ex.: chaves do cursor).
+    """
+    prepared = []
+    for doc in docs:
+        doc["id"] = doc.pop("_id")
+        if fields is not None:
+            doc = {name: doc[name] for name in fields if name in doc}
+        prepared.append(doc)
+    return prepared
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Divide um corpo em streaming (ex.: request.stream()) em linhas, sem carregá-lo inteiro.
+    Gera (número da linha, conteúdo); linhas maiores que `max_line_bytes` vêm como None
+    e são descartadas até o próximo '\\n'.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line_number += 1
+            too_long = oversized or end - start > max_line_bytes
+            yield line_number, None if too_long else bytes(buffer[start:end])
+            oversized = False
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            oversized = True
+            buffer.clear()
+
+    if buffer or oversized:
+        yield line_number + 1, None if oversized else bytes(buffer)
+
+
+class BSONJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse que serializa documentos BSON brutos direto para JSON,
+    sem passar pelos modelos Beanie/Pydantic (sem validação dupla).
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps_bson(content)
@@ -1,6 +1,7 @@
 from beanie import Document
 from uuid import UUID, uuid4
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 from typing import Optional
 
 class Category(Document):
@@ -10,4 +11,12 @@ class Category(Document):
     owner: UUID # Referência ao usuário dono da categoria
 
     class Settings:
-        name = "categories"
\ No newline at end of file
+        name = "categories"
+        # Nome único por usuário; também atende a listagem por owner
+        indexes = [
+            IndexModel(
+                [("owner", ASCENDING), ("name", ASCENDING)],
+                name="owner_name",
+                unique=True
+            ),
+        ]
\ No newline at end of file
@@ -0,0 +1,38 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from uuid import UUID
+from pydantic import Field
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+
+class TaskArchive(Document):
+    """
+    Tarefas concluídas ou removidas há tempo suficiente, movidas para fora da coleção
+    principal pelo job de arquivamento. Expiram pelo índice TTL em archived_at.
+    """
+    id: UUID = Field(alias="_id")
+    title: str
+    description: str
+    status: bool
+    created_at: datetime
+    updated_at: datetime
+    owner: UUID
+    category: Optional[UUID] = None
+    deleted_at: Optional[datetime] = None
+    archived_at: datetime
+
+    class Settings:
+        name = "tasks_archive"
+        indexes = [
+            IndexModel(
+                [("archived_at", ASCENDING)],
+                name="archived_at_ttl",
+                expireAfterSeconds=settings.ARCHIVE_RETENTION_DAYS * 24 * 3600
+            ),
+            IndexModel(
+                [("owner", ASCENDING), ("archived_at", ASCENDING)],
+                name="owner_archived_at"
+            ),
+        ]
@@ -1,8 +1,14 @@
-from beanie import Document, Indexed
+from beanie import Document, Indexed, Insert, Replace, Save, before_event
+from pymongo import ASCENDING, IndexModel, UpdateOne
 from uuid import UUID, uuid4
 from pydantic import Field
 from datetime import datetime, UTC
-from typing import Optional
+from typing import List, Optional
+
+from app.core.search import search_fields
+
+# Filtro das tarefas não removidas ({campo: None} também casa com documentos sem o campo)
+ACTIVE = {"deleted_at": None}
 
 class Task(Document):
     id: UUID = Field(default_factory=uuid4, alias="_id")
@@ -15,6 +21,83 @@ class Task(Document):
     
     category: Optional[UUID] = None  # Referência opcional para categoria
 
+    # Remoção lógica: tarefas com deleted_at ficam fora de todas as consultas até serem arquivadas
+    deleted_at: Optional[datetime] = None
+
+    # Prefixos normalizados de título/descrição, mantidos para a busca (ver app/core/search.py)
+    title_terms: List[str] = Field(default_factory=list)
+    description_terms: List[str] = Field(default_factory=list)
+    search_terms: List[str] = Field(default_factory=list)
+
+    @classmethod
+    def find_active(cls, *criteria):
+        """
+        Como find(), mas só com tarefas não removidas. O filtro de deleted_at é residual
+        (não está nos índices): as removidas são poucas e logo vão para o arquivo.
+        """
+        return cls.find(*criteria, ACTIVE)
+
+    @before_event(Insert, Replace, Save)
+    def refresh_search_terms(self):
+        for field, terms in search_fields(self.title, self.description).items():
+            setattr(self, field, terms)
+
+    @classmethod
+    async def backfill_search_terms(cls, batch_size: int = 500) -> int:
+        """
+        Preenche os campos de busca de tarefas gravadas antes deles existirem.
+        Retorna a quantidade de tarefas atualizadas.
+        """
+        collection = cls.get_motor_collection()
+        cursor = collection.find(
+            {"search_terms": {"$exists": False}},
+            {"title": 1, "description": 1}
+        ).batch_size(batch_size)
+
+        updated = 0
+        batch = []
+        async for doc in cursor:
+            fields = search_fields(doc.get("title", ""), doc.get("description", ""))
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            if len(batch) >= batch_size:
+                updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+        return updated
+
     class Settings:
         name = "tasks"
+        # Todas as consultas filtram por owner; a ordenação padrão é (created_at, _id).
+        # Buscas por owner + _id já são atendidas pelo índice único de _id.
+        indexes = [
+            IndexModel(
+                [("owner", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="owner_created_at_id"
+            ),
+            IndexModel(
+                [("owner", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="owner_status_created_at_id"
+            ),
+            IndexModel(
+                [("owner", ASCENDING), ("category", ASCENDING)],
+                name="owner_category"
+            ),
+            # Multikey: atende a busca por prefixos ($all) sem varrer as tarefas do usuário
+            IndexModel(
+                [("owner", ASCENDING), ("search_terms", ASCENDING)],
+                name="owner_search_terms"
+            ),
+            # Parciais e pequenos: só o que o job de arquivamento procura (concluídas e removidas)
+            IndexModel(
+                [("updated_at", ASCENDING)],
+                name="completed_updated_at",
+                partialFilterExpression={"status": True}
+            ),
+            IndexModel(
+                [("deleted_at", ASCENDING)],
+                name="deleted_at",
+                partialFilterExpression={"deleted_at": {"$type": "date"}}
+            ),
+        ]
         
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from uuid import UUID
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
 class TaskCreate(BaseModel):
     title: str = Field(
@@ -49,4 +49,47 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=3, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
     status: Optional[bool] = None
-    category: Optional[UUID] = None
\ No newline at end of file
+    category: Optional[UUID] = None
+
+class TaskBulkUpdate(TaskUpdate):
+    id: UUID = Field(..., description="ID da tarefa a atualizar")
+
+class TaskBulkDelete(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, description="IDs das tarefas a remover")
+
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Posição do item na requisição")
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "error"]
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+class CategoryCount(BaseModel):
+    category: Optional[UUID] = Field(None, description="ID da categoria (null para tarefas sem categoria)")
+    count: int
+
+class DayCount(BaseModel):
+    day: date
+    count: int
+
+class TaskStats(BaseModel):
+    total: int
+    done: int
+    pending: int
+    by_category: List[CategoryCount]
+    by_day: List[DayCount] = Field(..., description="Tarefas criadas por dia (UTC), só dias com tarefas")
+
+class ImportLineError(BaseModel):
+    line: int = Field(..., description="Número da linha no arquivo (a partir de 1)")
+    error: str
+
+class ImportResult(BaseModel):
+    lines: int = Field(..., description="Linhas não vazias processadas")
+    imported: int
+    failed: int
+    errors: List[ImportLineError] = Field(..., description="Primeiros erros, até IMPORT_MAX_ERRORS")
+    errors_truncated: bool = False
@@ -8,6 +8,10 @@ class UserAuth(BaseModel):
     username: str = Field(..., min_length=5, max_length=50)
     password: str = Field(..., min_length=5, max_length=20)
 
+class UserUpdate(BaseModel):
+    first_name: Optional[str] = Field(None, max_length=50)
+    last_name: Optional[str] = Field(None, max_length=50)
+
 class UserDetail(BaseModel):
     # O Pydantic V2 vai ler o '_id' do banco e entregar como 'id' no JSON
     id: UUID = Field(..., validation_alias="_id", serialization_alias="id")
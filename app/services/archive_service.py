@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.models.task_model import Task
+from app.models.task_archive_model import TaskArchive
+from app.services.task_service import TaskService
+from app.core.config import settings
+from app.core.serialization import as_uuid
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+class ArchiveService:
+    @staticmethod
+    def archivable_filter(now: datetime) -> Dict[str, Any]:
+        """
+        Tarefas concluídas sem alteração há ARCHIVE_COMPLETED_AFTER_DAYS ou removidas há
+        ARCHIVE_DELETED_AFTER_DAYS. Cada ramo do $or casa com um dos índices parciais da coleção.
+        """
+        return {"$or": [
+            {
+                "status": True,
+                "updated_at": {"$lt": now - timedelta(days=settings.ARCHIVE_COMPLETED_AFTER_DAYS)}
+            },
+            {
+                "deleted_at": {
+                    "$type": "date",
+                    "$lt": now - timedelta(days=settings.ARCHIVE_DELETED_AFTER_DAYS)
+                }
+            },
+        ]}
+
+    @staticmethod
+    async def archive_tasks(now: Optional[datetime] = None) -> int:
+        """
+        Move as tarefas arquiváveis para tasks_archive em lotes de ARCHIVE_BATCH_SIZE:
+        insert_many no arquivo e delete_many na coleção principal, por lote.
+        Idempotente: se um lote for interrompido, a próxima execução ignora as cópias já
+        arquivadas (chave duplicada) e conclui a remoção. Retorna quantas tarefas foram movidas.
+        """
+        now = now or datetime.now(UTC)
+        tasks = Task.get_motor_collection()
+        archive = TaskArchive.get_motor_collection()
+        query = ArchiveService.archivable_filter(now)
+        moved = 0
+
+        while True:
+            docs = await tasks.find(query).limit(settings.ARCHIVE_BATCH_SIZE).to_list(settings.ARCHIVE_BATCH_SIZE)
+            if not docs:
+                break
+
+            ids = [doc["_id"] for doc in docs]
+            for doc in docs:
+                doc["archived_at"] = now
+                # Campos de busca só servem à coleção principal
+                for field in ("title_terms", "description_terms", "search_terms"):
+                    doc.pop(field, None)
+
+            try:
+                await archive.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                if any(err["code"] != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                    raise
+
+            # O filtro é reaplicado: uma tarefa reaberta ou restaurada no meio do lote fica
+            result = await tasks.delete_many({"_id": {"$in": ids}, **query})
+            if result.deleted_count < len(ids):
+                kept = [doc["_id"] async for doc in tasks.find({"_id": {"$in": ids}}, {"_id": 1})]
+                if kept:
+                    await archive.delete_many({"_id": {"$in": kept}})
+
+            moved += result.deleted_count
+            for owner in {as_uuid(doc["owner"]) for doc in docs}:
+                await TaskService.tasks_changed(owner)
+
+            if len(docs) < settings.ARCHIVE_BATCH_SIZE:
+                break
+            # Cede o event loop entre lotes: o job roda no mesmo processo que as requisições
+            await asyncio.sleep(0)
+
+        if moved:
+            logger.info("Arquivamento de tarefas: %d movidas para %s", moved, TaskArchive.get_settings().name)
+        return moved
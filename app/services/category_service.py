@@ -0,0 +1,81 @@
+from typing import Iterable, List, Optional, Set
+from uuid import UUID
+
+from pymongo.errors import DuplicateKeyError
+
+from app.models.category_model import Category
+from app.schemas.category_schema import CategoryCreate, CategoryOut
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.database import db_session, remember_writes, routed_collection
+from app.core.serialization import projection_for
+from app.core.etag import versions
+
+# Categorias de cada usuário (lista completa, são poucas e mudam pouco), indexadas pelo owner.
+# Só o nível local: recarregar é uma consulta indexada; entre workers vale a invalidação publicada
+category_cache = Cache(
+    "categories",
+    maxsize=settings.CATEGORY_CACHE_MAX_SIZE,
+    ttl=settings.CATEGORY_CACHE_TTL_SECONDS
+)
+
+class CategoryService:
+    @staticmethod
+    async def categories_changed(owner: UUID) -> None:
+        """
+        Chamado após qualquer escrita nas categorias do usuário (criação, alteração, remoção).
+        """
+        await remember_writes(owner)
+        # Versão antes da invalidação, como em TaskService.tasks_changed (ver _load)
+        await versions.bump("categories", owner)
+        await category_cache.invalidate(owner)
+
+    @staticmethod
+    async def _load(owner: UUID) -> List[CategoryOut]:
+        # Uma escrita durante a leitura muda a versão: a lista lida não vai para o cache
+        version = await versions.current("categories", owner)
+        # Preferência de leitura em MONGO_ROUTE_READ_PREFERENCES["list_categories"]
+        cursor = routed_collection(Category, "list_categories").find(
+            Category.find(Category.owner == owner).get_filter_query(), projection_for(CategoryOut), session=db_session()
+        )
+        categories = [CategoryOut.model_validate(doc) async for doc in cursor]
+        if await versions.current("categories", owner) == version:
+            await category_cache.set(owner, categories)
+        return categories
+
+    @staticmethod
+    async def list_categories(owner: UUID) -> List[CategoryOut]:
+        categories = await category_cache.get(owner)
+        if categories is None:
+            categories = await CategoryService._load(owner)
+        return categories
+
+    @staticmethod
+    async def owned_category_ids(owner: UUID, category_ids: Iterable[Optional[UUID]]) -> Set[UUID]:
+        """
+        Retorna quais das categorias informadas pertencem ao usuário, a partir do cache.
+        Se alguma não estiver no cache, relê do banco uma vez antes de recusá-la
+        (a categoria pode ter sido criada em outro worker).
+        """
+        ids = {category_id for category_id in category_ids if category_id}
+        if not ids:
+            return set()
+        owned = {category.id for category in await CategoryService.list_categories(owner)}
+        if not ids <= owned:
+            owned = {category.id for category in await CategoryService._load(owner)}
+        return ids & owned
+
+    @staticmethod
+    async def create_category(owner: UUID, data: CategoryCreate) -> Category:
+        category = Category(
+            name=data.name,
+            color=data.color,
+            owner=owner
+        )
+        # O índice único (owner, name) recusa duplicatas sem uma consulta extra
+        try:
+            await category.insert(session=db_session())
+        except DuplicateKeyError:
+            raise ValueError("Category with this name already exists.")
+        await CategoryService.categories_changed(owner)
+        return category
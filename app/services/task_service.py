@@ -0,0 +1,492 @@
+import csv
+import io
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Literal, Optional, Set, Tuple
+from uuid import UUID
+
+from beanie.odm.utils.encoder import Encoder
+from bson import Binary
+from beanie.operators import In
+from pydantic import BaseModel, Field, ValidationError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.models.task_model import ACTIVE, Task
+from app.schemas.task_schema import (
+    BulkItemResult, CategoryCount, DayCount, ImportLineError, ImportResult,
+    TaskBulkUpdate, TaskCreate, TaskStats
+)
+from app.services.category_service import CategoryService
+from app.core.cache import Cache
+from app.core.config import settings
+from app.core.database import db_session, remember_writes, routed_collection
+from app.core.etag import versions
+from app.core.search import edge_ngrams
+from app.core.serialization import as_uuid, dumps_bson
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_NOT_FOUND = "A categoria informada não foi encontrada ou não pertence a você."
+TASK_NOT_FOUND = "Task not found"
+DUPLICATE_ID = "Tarefa repetida na mesma requisição."
+
+# Estatísticas de /tasks/stats por usuário; descartadas a cada escrita (ver TaskService.tasks_changed).
+# Compartilhadas entre workers com MULTI_WORKER: a agregação é a consulta mais cara da API
+stats_cache = Cache(
+    "task_stats",
+    maxsize=settings.STATS_CACHE_MAX_SIZE,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+    shared=True,
+    dump=lambda stats: stats.model_dump(mode="json"),
+    load=TaskStats.model_validate
+)
+
+# Colunas da exportação (/tasks/export), na ordem do CSV
+EXPORT_FIELDS = ("id", "title", "description", "status", "category", "created_at", "updated_at")
+
+# Campos que não aceitam null; um null explícito no TaskUpdate é ignorado
+NON_NULLABLE_FIELDS = ("title", "description", "status")
+
+
+class _IdView(BaseModel):
+    id: UUID = Field(alias="_id")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (Binary, UUID)):
+        return str(as_uuid(value))
+    return value
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+
+def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+    return {err["index"]: err.get("errmsg", "write error") for err in error.details.get("writeErrors", [])}
+
+
+class TaskService:
+    @staticmethod
+    async def tasks_changed(owner: UUID) -> None:
+        """
+        Ponto único chamado após qualquer escrita nas tarefas do usuário:
+        descarta o que é derivado delas e fica em cache, muda a versão usada nos ETags e
+        guarda o ponto da escrita para as próximas leituras do usuário (read-your-writes).
+        """
+        await remember_writes(owner)
+        # A versão muda antes da invalidação: quem calculou as estatísticas com a versão
+        # antiga não as grava (ver get_stats), e o que já foi gravado sai logo em seguida
+        await versions.bump("tasks", owner)
+        await stats_cache.invalidate(owner)
+
+    @staticmethod
+    async def create_task(owner: UUID, data: TaskCreate) -> Task:
+        task = Task(
+            title=data.title,
+            description=data.description,
+            owner=owner,
+            category=data.category  # Salvamos o UUID da categoria na tarefa
+        )
+        await task.insert(session=db_session())
+        await TaskService.tasks_changed(owner)
+        return task
+
+    @staticmethod
+    def update_pipeline(changes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Pipeline de update que aplica as mudanças, recalcula os campos de busca e
+        atualiza updated_at no servidor ($$NOW), tudo em uma única operação.
+        """
+        changes = {
+            field: value for field, value in changes.items()
+            if value is not None or field not in NON_NULLABLE_FIELDS
+        }
+        # Só o lado alterado (título ou descrição) é recalculado; a união usa o valor gravado do outro
+        if "title" in changes:
+            changes["title_terms"] = edge_ngrams(changes["title"])
+        if "description" in changes:
+            changes["description_terms"] = edge_ngrams(changes["description"])
+
+        # $literal impede que valores do usuário iniciados com '$' sejam lidos como expressões
+        values = {field: {"$literal": value} for field, value in Encoder().encode(changes).items()}
+        values["updated_at"] = "$$NOW"
+
+        pipeline = [{"$set": values}]
+        if "title_terms" in changes or "description_terms" in changes:
+            pipeline.append({"$set": {"search_terms": {"$setUnion": ["$title_terms", "$description_terms"]}}})
+        return pipeline
+
+    @staticmethod
+    async def update_task(owner: UUID, task_id: UUID, changes: Dict[str, Any]) -> Optional[Task]:
+        """
+        Atualiza a tarefa do usuário com um único find_one_and_update e retorna o documento já atualizado.
+        Retorna None se a tarefa não existir ou não pertencer ao usuário.
+        """
+        raw = await Task.get_motor_collection().find_one_and_update(
+            Encoder().encode({"_id": task_id, "owner": owner, **ACTIVE}),
+            TaskService.update_pipeline(changes),
+            return_document=ReturnDocument.AFTER,
+            session=db_session()
+        )
+        if not raw:
+            return None
+        await TaskService.tasks_changed(owner)
+        return Task.model_validate(raw)
+
+    @staticmethod
+    async def delete_task(owner: UUID, task_id: UUID) -> bool:
+        """
+        Remove logicamente a tarefa do usuário (deleted_at) com um único update_one filtrado por owner.
+        A remoção definitiva fica com o job de arquivamento.
+        """
+        result = await Task.get_motor_collection().update_one(
+            Encoder().encode({"_id": task_id, "owner": owner, **ACTIVE}),
+            [{"$set": {"deleted_at": "$$NOW", "updated_at": "$$NOW"}}],
+            session=db_session()
+        )
+        if not result.matched_count:
+            return False
+        await TaskService.tasks_changed(owner)
+        return True
+
+    @staticmethod
+    async def bulk_create(owner: UUID, items: List[TaskCreate]) -> List[BulkItemResult]:
+        allowed_categories = await CategoryService.owned_category_ids(owner, (item.category for item in items))
+
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        positions: List[int] = []
+        tasks: List[Task] = []
+
+        for index, item in enumerate(items):
+            if item.category and item.category not in allowed_categories:
+                results[index] = BulkItemResult(index=index, status="error", error=CATEGORY_NOT_FOUND)
+                continue
+            task = Task(
+                title=item.title,
+                description=item.description,
+                owner=owner,
+                category=item.category
+            )
+            # insert_many não dispara os eventos do Beanie
+            task.refresh_search_terms()
+            positions.append(index)
+            tasks.append(task)
+
+        failed: Dict[int, str] = {}
+        if tasks:
+            try:
+                await Task.insert_many(tasks, ordered=False, session=db_session())
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+            await TaskService.tasks_changed(owner)
+
+        for position, (index, task) in enumerate(zip(positions, tasks)):
+            if position in failed:
+                results[index] = BulkItemResult(index=index, status="error", error=failed[position])
+            else:
+                results[index] = BulkItemResult(index=index, id=task.id, status="created")
+
+        return results
+
+    @staticmethod
+    async def bulk_update(owner: UUID, items: List[TaskBulkUpdate]) -> List[BulkItemResult]:
+        task_ids = list({item.id for item in items})
+        owned = {
+            task.id
+            for task in await Task.find_active(In(Task.id, task_ids), Task.owner == owner).project(_IdView).to_list()
+        }
+        allowed_categories = await CategoryService.owned_category_ids(owner, (item.category for item in items))
+
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        positions: List[int] = []
+        operations: List[UpdateOne] = []
+        encoder = Encoder()
+        seen: Set[UUID] = set()
+
+        for index, item in enumerate(items):
+            # Com ordered=False a ordem entre duas alterações da mesma tarefa não é garantida
+            if item.id in seen:
+                results[index] = BulkItemResult(index=index, id=item.id, status="error", error=DUPLICATE_ID)
+                continue
+            seen.add(item.id)
+            if item.id not in owned:
+                results[index] = BulkItemResult(index=index, id=item.id, status="error", error=TASK_NOT_FOUND)
+                continue
+            if item.category and item.category not in allowed_categories:
+                results[index] = BulkItemResult(index=index, id=item.id, status="error", error=CATEGORY_NOT_FOUND)
+                continue
+
+            positions.append(index)
+            operations.append(UpdateOne(
+                encoder.encode({"_id": item.id, "owner": owner, **ACTIVE}),
+                TaskService.update_pipeline(item.model_dump(exclude_unset=True, exclude={"id"}))
+            ))
+
+        failed: Dict[int, str] = {}
+        if operations:
+            try:
+                result = await Task.get_motor_collection().bulk_write(
+                    operations, ordered=False, session=db_session()
+                )
+                matched = result.matched_count
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+                matched = e.details.get("nMatched", 0)
+            await TaskService.tasks_changed(owner)
+
+            if matched < len(operations) - len(failed):
+                # Alguma tarefa foi removida entre a leitura de posse e a escrita: o status de
+                # cada item vem de quem ainda casa com o filtro do update, não da leitura anterior
+                attempted = [items[index].id for position, index in enumerate(positions) if position not in failed]
+                still_active = {
+                    task.id
+                    for task in await Task.find_active(
+                        In(Task.id, attempted), Task.owner == owner
+                    ).project(_IdView).to_list()
+                }
+                for position, index in enumerate(positions):
+                    if position not in failed and items[index].id not in still_active:
+                        failed[position] = TASK_NOT_FOUND
+
+        for position, index in enumerate(positions):
+            item_id = items[index].id
+            if position in failed:
+                results[index] = BulkItemResult(index=index, id=item_id, status="error", error=failed[position])
+            else:
+                results[index] = BulkItemResult(index=index, id=item_id, status="updated")
+
+        return results
+
+    @staticmethod
+    async def bulk_delete(owner: UUID, task_ids: List[UUID]) -> List[BulkItemResult]:
+        owned = {
+            task.id
+            for task in await Task.find_active(
+                In(Task.id, list(set(task_ids))), Task.owner == owner
+            ).project(_IdView).to_list()
+        }
+        deleted = owned
+        if owned:
+            # Marca de tempo própria (precisão de ms, como no BSON): identifica o que esta chamada removeu
+            now = datetime.now(UTC)
+            deleted_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            result = await Task.get_motor_collection().update_many(
+                Encoder().encode({"_id": {"$in": list(owned)}, "owner": owner, **ACTIVE}),
+                [{"$set": {"deleted_at": deleted_at, "updated_at": "$$NOW"}}],
+                session=db_session()
+            )
+            await TaskService.tasks_changed(owner)
+            if result.modified_count < len(owned):
+                # Outra requisição removeu parte delas entre a leitura e a escrita
+                deleted = {
+                    as_uuid(doc["_id"])
+                    async for doc in Task.get_motor_collection().find(
+                        Encoder().encode({"_id": {"$in": list(owned)}, "owner": owner, "deleted_at": deleted_at}),
+                        {"_id": 1},
+                        session=db_session()
+                    )
+                }
+
+        results: List[BulkItemResult] = []
+        seen: Set[UUID] = set()
+        for index, task_id in enumerate(task_ids):
+            if task_id in seen:
+                results.append(BulkItemResult(index=index, id=task_id, status="error", error=DUPLICATE_ID))
+            elif task_id in deleted:
+                results.append(BulkItemResult(index=index, id=task_id, status="deleted"))
+            else:
+                results.append(BulkItemResult(index=index, id=task_id, status="error", error=TASK_NOT_FOUND))
+            seen.add(task_id)
+        return results
+
+    @staticmethod
+    def stats_pipeline(since: datetime) -> List[Dict[str, Any]]:
+        """
+        Uma única agregação ($facet) com as contagens por status, por categoria e por dia
+        de criação (UTC, a partir de `since`). O $match por owner vem do Beanie (índices por owner).
+        """
+        return [
+            {"$project": {"_id": 0, "status": 1, "category": 1, "created_at": 1}},
+            {"$facet": {
+                "by_status": [
+                    {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+                ],
+                "by_category": [
+                    {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                ],
+                "by_day": [
+                    {"$match": {"created_at": {"$gte": since}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                        "count": {"$sum": 1}
+                    }},
+                    {"$sort": {"_id": 1}},
+                ],
+            }},
+        ]
+
+    @staticmethod
+    async def get_stats(owner: UUID) -> TaskStats:
+        """
+        Estatísticas das tarefas do usuário, com a contagem por dia dos últimos STATS_MAX_DAYS.
+        Servidas do cache até a próxima escrita (ou até o TTL, para escritas de outros workers).
+        """
+        stats = await stats_cache.get(owner)
+        if stats is not None:
+            return stats
+
+        # Uma escrita durante a agregação muda a versão; o resultado, talvez já defasado, não vai para o cache
+        version = await versions.current("tasks", owner)
+        today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+        since = today - timedelta(days=settings.STATS_MAX_DAYS - 1)
+        # Leitura pesada: pode ir para um secundário (MONGO_ROUTE_READ_PREFERENCES["task_stats"])
+        match = Task.find_active(Task.owner == owner).get_filter_query()
+        result = await routed_collection(Task, "task_stats").aggregate(
+            [{"$match": match}] + TaskService.stats_pipeline(since), session=db_session()
+        ).to_list(None)
+        facets = result[0]
+
+        by_status = {doc["_id"]: doc["count"] for doc in facets["by_status"]}
+        stats = TaskStats(
+            total=sum(by_status.values()),
+            done=by_status.get(True, 0),
+            pending=by_status.get(False, 0),
+            by_category=[
+                CategoryCount(category=as_uuid(doc["_id"]) if doc["_id"] is not None else None, count=doc["count"])
+                for doc in facets["by_category"]
+            ],
+            by_day=[DayCount(day=doc["_id"], count=doc["count"]) for doc in facets["by_day"]],
+        )
+        if await versions.current("tasks", owner) == version:
+            await stats_cache.set(owner, stats)
+        return stats
+
+    @staticmethod
+    async def export_tasks(
+        owner: UUID,
+        fmt: Literal["ndjson", "csv"] = "ndjson",
+        task_status: Optional[bool] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Gera todas as tarefas do usuário em NDJSON ou CSV, um bloco por lote do cursor.
+        A memória usada não depende do total de tarefas e o primeiro bloco sai
+        assim que o primeiro lote chega do Mongo.
+        """
+        query: Dict[str, Any] = {"owner": owner, **ACTIVE}
+        if task_status is not None:
+            query["status"] = task_status
+        projection = {("_id" if field == "id" else field): 1 for field in EXPORT_FIELDS}
+
+        cursor = (
+            Task.get_motor_collection()
+            .find(Encoder().encode(query), projection)
+            .sort([("created_at", 1), ("_id", 1)])  # índice (owner, created_at, _id)
+            .batch_size(settings.EXPORT_BATCH_SIZE)
+        )
+
+        # Linhas do bloco atual (NDJSON) ou buffer do csv.writer (CSV)
+        lines: List[bytes] = []
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(EXPORT_FIELDS)
+
+        def flush() -> bytes:
+            data = b"".join(lines) if fmt == "ndjson" else buffer.getvalue().encode()
+            lines.clear()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+
+        pending = 0
+        try:
+            async for doc in cursor:
+                doc["id"] = doc.pop("_id")
+                if fmt == "ndjson":
+                    lines.append(dumps_bson({field: doc.get(field) for field in EXPORT_FIELDS}) + b"\n")
+                else:
+                    writer.writerow([_csv_value(doc.get(field)) for field in EXPORT_FIELDS])
+                pending += 1
+                if pending >= settings.EXPORT_BATCH_SIZE:
+                    pending = 0
+                    yield flush()
+        finally:
+            await cursor.close()
+
+        data = flush()
+        if data:
+            yield data
+
+    @staticmethod
+    async def import_tasks(
+        owner: UUID,
+        lines: AsyncIterable[Tuple[int, Optional[bytes]]]
+    ) -> ImportResult:
+        """
+        Importa tarefas de linhas NDJSON (cada uma um TaskCreate), validadas uma a uma e gravadas
+        em blocos de IMPORT_CHUNK_SIZE via bulk_create: um insert_many não ordenado e uma única
+        validação de categorias por bloco. Só um bloco fica em memória.
+        """
+        processed = imported = failed = 0
+        errors: List[ImportLineError] = []
+        chunk: List[Tuple[int, TaskCreate]] = []
+
+        def record_error(line: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < settings.IMPORT_MAX_ERRORS:
+                errors.append(ImportLineError(line=line, error=message))
+
+        async def flush():
+            nonlocal imported
+            results = await TaskService.bulk_create(owner, [item for _, item in chunk])
+            for (line, _), result in zip(chunk, results):
+                if result.status == "error":
+                    record_error(line, result.error)
+                else:
+                    imported += 1
+            chunk.clear()
+            logger.info(
+                "Importação de tarefas do usuário %s: %d linhas processadas, %d importadas, %d com erro",
+                owner, processed, imported, failed
+            )
+
+        async for line, raw in lines:
+            if raw is None:
+                processed += 1
+                record_error(line, f"Linha maior que {settings.IMPORT_MAX_LINE_BYTES} bytes")
+                continue
+            if not raw.strip():
+                continue
+            processed += 1
+            try:
+                chunk.append((line, TaskCreate.model_validate_json(raw)))
+            except ValidationError as e:
+                record_error(line, _validation_message(e))
+                continue
+            if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+                await flush()
+
+        if chunk:
+            await flush()
+
+        errors.sort(key=lambda error: error.line)
+        return ImportResult(
+            lines=processed,
+            imported=imported,
+            failed=failed,
+            errors=errors,
+            errors_truncated=failed > len(errors)
+        )
@@ -3,8 +3,21 @@ from typing import Optional
 
 # AJUSTES DE IMPORT (Padrão absoluto para evitar 'ModuleNotFoundError')
 from app.models.user_model import User
-from app.schemas.user_schema import UserAuth 
-from app.core.security import hash_password, verify_password
+from app.schemas.user_schema import UserAuth, UserUpdate
+from app.core.security import hash_password_async, verify_password_async
+from beanie.odm.utils.encoder import Encoder
+
+from app.core.cache import Cache
+from app.core.database import db_session, remember_writes, routed_collection
+from app.core.config import settings
+
+# Cache dos usuários autenticados, indexado pelo 'sub' do token (str do UUID). Só o nível
+# local (o documento não sai do worker); alterações são publicadas aos demais com MULTI_WORKER
+user_cache = Cache(
+    "users",
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
 
 class UserService:
     @staticmethod
@@ -17,20 +30,63 @@ class UserService:
         user = User(
             username=data.username,
             email=data.email,
-            hash_password=hash_password(data.password)
+            hash_password=await hash_password_async(data.password)
         )
         await user.insert()
+        await user_cache.invalidate(str(user.id))
         return user
     
     @staticmethod
     async def authenticate_user(email: str, password: str) -> Optional[User]:
         user = await User.find_one(User.email == email)
         
-        if user and verify_password(password, user.hash_password):
+        if user and await verify_password_async(password, user.hash_password):
             return user
         return None
     
     @staticmethod
     async def get_user_by_id(user_id: UUID) -> Optional[User]:
         # Como o ID é UUID no model, pode ser usado diretamente o UUID aqui.
-        return await User.get(user_id)
\ No newline at end of file
+        return await User.get(user_id)
+
+    @staticmethod
+    async def get_cached_user(user_id: UUID) -> Optional[User]:
+        """
+        Versão com cache de get_user_by_id, usada no caminho quente da autenticação.
+        Apenas usuários encontrados são guardados; ausências sempre consultam o banco.
+        """
+        # O _id é gravado como UUID binário: um str nunca casaria na consulta direta
+        user_id = UUID(str(user_id))
+        key = str(user_id)
+        user = await user_cache.get(key)
+        if user is None:
+            # Preferência de leitura em MONGO_ROUTE_READ_PREFERENCES["get_current_user"]
+            raw = await routed_collection(User, "get_current_user").find_one(
+                Encoder().encode({"_id": user_id}), session=db_session()
+            )
+            if raw:
+                user = User.model_validate(raw)
+                await user_cache.set(key, user)
+        return user
+
+    @staticmethod
+    async def update_user(user_id: UUID, data: UserUpdate) -> User:
+        user = await User.get(user_id)
+        if not user:
+            raise ValueError("Usuário não encontrado")
+
+        await user.set(data.model_dump(exclude_unset=True), session=db_session())
+        await remember_writes(user_id)
+        await user_cache.invalidate(str(user_id))
+        return user
+
+    @staticmethod
+    async def disable_user(user_id: UUID) -> User:
+        user = await User.get(user_id)
+        if not user:
+            raise ValueError("Usuário não encontrado")
+
+        await user.set({User.disabled: True}, session=db_session())
+        await remember_writes(user_id)
+        await user_cache.invalidate(str(user_id))
+        return user
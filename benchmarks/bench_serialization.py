@@ -0,0 +1,103 @@
+"""
+Custo por item da serialização de GET /tasks, antes e depois do caminho rápido.
+
+Antes:  documento completo -> Task (Beanie) -> response_model List[TaskOut] -> JSONResponse
+Depois: documento projetado nos campos de TaskOut -> BSONJSONResponse (orjson)
+
+Os documentos são gerados no formato em que o Motor os entrega (UUIDs como Binary),
+então só a etapa de montagem/serialização é medida. O MongoDB local é usado apenas
+para inicializar o Beanie, como nos testes.
+
+Uso:
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from beanie import init_beanie
+from bson import Binary
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.search import search_fields
+from app.core.serialization import BSONJSONResponse, prepare_documents, projection_for
+from app.models.category_model import Category
+from app.models.task_model import Task
+from app.models.user_model import User
+from app.schemas.task_schema import TaskOut
+
+SIZES = (1_000, 10_000)
+REPEAT = 5
+
+
+def make_raw_tasks(count: int) -> List[Dict[str, Any]]:
+    owner = Binary.from_uuid(uuid4())
+    start = datetime(2026, 1, 1)
+    docs = []
+    for i in range(count):
+        title = f"Tarefa número {i} do benchmark"
+        description = ("Descrição detalhada da tarefa com bastante texto. " * 10)[:500]
+        docs.append({
+            "_id": Binary.from_uuid(uuid4()),
+            "title": title,
+            "description": description,
+            "status": i % 3 == 0,
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i),
+            "owner": owner,
+            "category": None,
+            **search_fields(title, description),
+        })
+    return docs
+
+
+async def before(raw_docs: List[Dict[str, Any]], field) -> bytes:
+    tasks = [Task.model_validate(doc) for doc in raw_docs]
+    content = await serialize_response(field=field, response_content=tasks)
+    return JSONResponse(content).body
+
+
+def after(projected_docs: List[Dict[str, Any]]) -> bytes:
+    # Cópia rasa: prepare_documents renomeia '_id' no próprio dict
+    docs = [dict(doc) for doc in projected_docs]
+    return BSONJSONResponse(prepare_documents(docs)).body
+
+
+async def best_of(func, *args) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    await init_beanie(database=client.get_default_database(), document_models=[User, Task, Category])
+
+    field = create_response_field(name="response", type_=List[TaskOut])
+    projection = projection_for(TaskOut)
+
+    print(f"{'itens':>8} {'antes (µs/item)':>16} {'depois (µs/item)':>17} {'ganho':>7}")
+    for size in SIZES:
+        raw_docs = make_raw_tasks(size)
+        projected = [{key: doc[key] for key in projection} for doc in raw_docs]
+
+        old = await best_of(before, raw_docs, field)
+        new = await best_of(after, projected)
+        print(f"{size:>8} {old / size * 1e6:>16.2f} {new / size * 1e6:>17.2f} {old / new:>6.1f}x")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Vazão de codificação e verificação de JWT por backend, e da verificação com cache.
+
+Uso:
+    python -m benchmarks.bench_tokens
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.security import TOKEN_BACKENDS, decode_access_token, token_cache
+
+ITERATIONS = 20_000
+
+
+def ops_per_second(func: Callable[[], object], iterations: int = ITERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    claims = {"sub": str(uuid4()), "exp": datetime.now(timezone.utc) + timedelta(minutes=60)}
+    key, algorithm = settings.JWT_SECRET_KEY, settings.ALGORITHM
+
+    print(f"{'backend':>10} {'encode (ops/s)':>15} {'decode (ops/s)':>15}")
+    for name, backend_cls in TOKEN_BACKENDS.items():
+        try:
+            backend = backend_cls()
+        except RuntimeError as e:
+            print(f"{name:>10} indisponível: {e}")
+            continue
+        token = backend.encode(claims, key, algorithm)
+        encode = ops_per_second(lambda: backend.encode(claims, key, algorithm))
+        decode = ops_per_second(lambda: backend.decode(token, key, [algorithm]))
+        print(f"{name:>10} {encode:>15,.0f} {decode:>15,.0f}")
+
+    # Verificação com o cache de tokens (backend configurado em JWT_BACKEND)
+    token = TOKEN_BACKENDS[settings.JWT_BACKEND]().encode(claims, key, algorithm)
+    token_cache.clear()
+    decode_access_token(token)
+    cached = ops_per_second(lambda: decode_access_token(token))
+    print(f"{'cache':>10} {'':>15} {cached:>15,.0f}  (JWT_BACKEND={settings.JWT_BACKEND}, hit)")
+
+
+if __name__ == "__main__":
+    main()
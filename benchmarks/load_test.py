@@ -0,0 +1,262 @@
+"""
+Benchmark de carga das rotas da API, executado em processo via httpx.ASGITransport
+(como em tests/conftest.py), contra um mongod local.
+
+Popula um banco dedicado com usuários e tarefas, mede login, listagem, criação,
+atualização e remoção, e grava p50/p95/p99 e requisições/s em JSON para comparar
+execuções entre commits. O banco é removido ao final: o nome dele precisa conter
+'bench', e um banco que já existe só é reaproveitado (e apagado) com --drop.
+
+Uso:
+    python -m benchmarks.load_test --users 1000 --tasks 10000 --output bench.json
+    python -m benchmarks.load_test --compare bench.json   # compara com uma execução anterior
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from beanie import init_beanie
+from httpx import ASGITransport, AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.app import app
+from app.core.config import settings
+from app.core.security import hash_password
+from app.models.category_model import Category
+from app.models.task_model import Task
+from app.models.task_archive_model import TaskArchive
+from app.models.user_model import User
+
+API = "/api/v1"
+PASSWORD = "password123"
+SEED_BATCH_SIZE = 1_000
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def seed(users: int, tasks: int) -> List[str]:
+    """
+    Cria `users` usuários e `tasks` tarefas distribuídas entre eles. Retorna os e-mails.
+    O hash da senha é calculado uma vez e reaproveitado, para o seed não levar horas.
+    """
+    password_hash = hash_password(PASSWORD)
+    emails = [f"bench_{i}@bench.test" for i in range(users)]
+    user_docs = [
+        User(username=f"bench_user_{i}", email=email, hash_password=password_hash)
+        for i, email in enumerate(emails)
+    ]
+    for start in range(0, len(user_docs), SEED_BATCH_SIZE):
+        await User.insert_many(user_docs[start:start + SEED_BATCH_SIZE])
+
+    batch: List[Task] = []
+    for i in range(tasks):
+        task = Task(
+            title=f"Tarefa {i} de carga",
+            description=("Descrição realista de uma tarefa de benchmark. " * 8)[:random.randint(40, 400)],
+            status=random.random() < 0.3,
+            owner=user_docs[i % users].id,
+        )
+        task.refresh_search_terms()
+        batch.append(task)
+        if len(batch) >= SEED_BATCH_SIZE:
+            await Task.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await Task.insert_many(batch, ordered=False)
+    return emails
+
+
+async def run_scenario(
+    name: str,
+    total: int,
+    concurrency: int,
+    make_request: Callable[[int], Awaitable[int]]
+) -> Dict[str, Any]:
+    """
+    Dispara `total` requisições com no máximo `concurrency` simultâneas.
+    `make_request(i)` retorna o status HTTP da i-ésima requisição.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            status_code = await make_request(i)
+            latencies.append(time.perf_counter() - start)
+            if status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    print(
+        f"{name:>8}: {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+        f"p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  erros {errors}"
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mongo = AsyncIOMotorClient(args.mongo_uri)
+    database = mongo.get_default_database()
+    # O benchmark apaga o banco: só aceita bancos dedicados, para nunca apagar dados reais
+    if "bench" not in database.name.lower():
+        raise SystemExit(f"O banco '{database.name}' não parece ser de benchmark (o nome precisa conter 'bench').")
+    if database.name in await mongo.list_database_names():
+        if not args.drop:
+            raise SystemExit(f"O banco '{database.name}' já existe; use --drop para apagá-lo e reaproveitá-lo.")
+        await mongo.drop_database(database.name)
+    # Todo o tráfego sai do mesmo IP; o limite de tentativas de login distorceria o cenário
+    settings.RATE_LIMIT_ENABLED = False
+    # O ASGITransport não executa o lifespan; o Beanie é inicializado aqui, como no conftest
+    await init_beanie(database=database, document_models=[User, Task, Category, TaskArchive])
+
+    print(f"Populando {args.users} usuários e {args.tasks} tarefas em '{database.name}'...")
+    emails = await seed(args.users, args.tasks)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int) -> int:
+            response = await client.post(f"{API}/auth/login", data={
+                "username": emails[i % len(emails)], "password": PASSWORD
+            })
+            return response.status_code
+
+        # Tokens de uma amostra de usuários para as rotas autenticadas
+        sample = emails[:min(args.sessions, len(emails))]
+        headers = []
+        for email in sample:
+            response = await client.post(f"{API}/auth/login", data={"username": email, "password": PASSWORD})
+            headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+        created: List[List[str]] = [[] for _ in headers]
+
+        async def list_tasks(i: int) -> int:
+            response = await client.get(f"{API}/tasks/", params={"limit": args.page_size},
+                                        headers=headers[i % len(headers)])
+            return response.status_code
+
+        async def create(i: int) -> int:
+            slot = i % len(headers)
+            response = await client.post(f"{API}/tasks/create", json={
+                "title": f"Criada no benchmark {i}", "description": "Carga de escrita"
+            }, headers=headers[slot])
+            if response.status_code == 201:
+                created[slot].append(response.json()["id"])
+            return response.status_code
+
+        async def update(i: int) -> int:
+            slot = i % len(headers)
+            if not created[slot]:
+                return 404
+            task_id = created[slot][(i // len(headers)) % len(created[slot])]
+            response = await client.put(f"{API}/tasks/{task_id}", json={"status": True, "title": f"Atualizada {i}"},
+                                        headers=headers[slot])
+            return response.status_code
+
+        async def delete(i: int) -> int:
+            slot = i % len(headers)
+            if not created[slot]:
+                return 404
+            task_id = created[slot].pop()
+            response = await client.delete(f"{API}/tasks/{task_id}", headers=headers[slot])
+            return response.status_code
+
+        results = {
+            "login": await run_scenario("login", min(args.requests, args.login_requests), args.concurrency, login),
+            "list": await run_scenario("list", args.requests, args.concurrency, list_tasks),
+            "create": await run_scenario("create", args.requests, args.concurrency, create),
+            "update": await run_scenario("update", args.requests, args.concurrency, update),
+            "delete": await run_scenario("delete", args.requests, args.concurrency, delete),
+        }
+
+    # Criado por esta execução (ou apagado com --drop no início)
+    await mongo.drop_database(database.name)
+    mongo.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparação com {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        rps_delta = (result["rps"] / old["rps"] - 1) * 100 if old["rps"] else 0.0
+        p95_delta = (result["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        print(f"{name:>8}: req/s {rps_delta:+6.1f}%   p95 {p95_delta:+6.1f}%")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/todofast_bench")
+    parser.add_argument("--drop", action="store_true", help="apaga o banco de benchmark se ele já existir")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--tasks", type=int, default=10_000, help="total de tarefas, distribuídas entre os usuários")
+    parser.add_argument("--requests", type=int, default=2_000, help="requisições por cenário")
+    parser.add_argument("--login-requests", type=int, default=200, help="limite do cenário de login (bcrypt)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=50, help="usuários autenticados nas rotas de tarefas")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados salvos em {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,27 @@ from httpx import AsyncClient, ASGITransport
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 import asyncio
+import uuid
 
 from app.app import app
 from app.models.category_model import Category
 from app.models.user_model import User
 from app.models.task_model import Task
+from app.models.task_archive_model import TaskArchive
+from app.services.user_service import user_cache
+from app.core.security import token_cache
+from app.services.task_service import stats_cache
+from app.services.category_service import category_cache
+from app.core.etag import versions
+from app.core.rate_limit import rate_limit_backend
+from app.core.database import causal_tokens
+
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
 
+
 @pytest.fixture(scope="function", autouse=True) # Limpa o banco de dados antes de CADA teste
 async def initialize_db():
     client = AsyncIOMotorClient("mongodb://localhost:27017")
@@ -20,17 +31,43 @@ async def initialize_db():
     # Inicializa Beanie
     await init_beanie(
         database=client.todofast_test,
-        document_models=[User, Task, Category] 
+        document_models=[User, Task, Category, TaskArchive] 
     )
     
     yield
     
-    # Limpa o banco após CADA teste (evita conflitos de e-mail duplicado)
+    # Limpa o banco e os caches em processo após CADA teste (evita conflitos de e-mail duplicado)
+    user_cache.clear()
+    token_cache.clear()
+    stats_cache.clear()
+    category_cache.clear()
+    versions.clear()
+    causal_tokens.clear()
+    await rate_limit_backend.reset()
     await client.drop_database("todofast_test")
     client.close()
 
+
 @pytest.fixture
 async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
\ No newline at end of file
+        yield ac
+
+
+@pytest.fixture
+async def auth_token(client: AsyncClient):
+    """Cria um utilizador e retorna o token de acesso."""
+    unique_id = uuid.uuid4().hex
+    user_data = {
+        "username": f"user_{unique_id}",
+        "email": f"owner_{unique_id}@test.com",
+        "password": "password123"
+    }
+    await client.post("/api/v1/users/create", json=user_data)
+
+    login_res = await client.post("/api/v1/auth/login", data={
+        "username": user_data["email"],
+        "password": "password123"
+    })
+    return login_res.json()["access_token"]
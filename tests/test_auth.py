@@ -1,6 +1,10 @@
 import pytest
 from httpx import AsyncClient
 
+from app.core.security import create_refresh_token
+from app.services.user_service import user_cache
+
+
 # Teste 1: Criar Usuário com sucesso
 async def test_create_user_success(client: AsyncClient):
     response = await client.post(
@@ -14,6 +18,7 @@ async def test_create_user_success(client: AsyncClient):
     assert response.status_code == 201
     assert response.json()["email"] == "dev@test.com"
 
+
 # Teste 2: Tentar criar usuário com e-mail duplicado
 async def test_create_user_duplicate_email(client: AsyncClient):
     payload = {
@@ -48,4 +53,96 @@ async def test_login_success(client: AsyncClient):
     response = await client.post("/api/v1/auth/login", data=login_data)
     
     assert response.status_code == 200
-    assert "access_token" in response.json()
\ No newline at end of file
+    assert "access_token" in response.json()
+
+
+async def test_update_me_invalidates_user_cache(client: AsyncClient):
+    user_data = {
+        "username": "cache_user",
+        "email": "cache@test.com",
+        "password": "password123"
+    }
+    await client.post("/api/v1/users/create", json=user_data)
+    login_res = await client.post("/api/v1/auth/login", data={
+        "username": user_data["email"],
+        "password": user_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    # Primeira leitura popula o cache
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["first_name"] is None
+
+    response = await client.put("/api/v1/users/me", json={"first_name": "Ana"}, headers=headers)
+    assert response.status_code == 200
+
+    # Sem invalidação, o usuário em cache ainda teria first_name = None
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["first_name"] == "Ana"
+
+
+async def test_refresh_and_tampered_token(client: AsyncClient):
+    user_data = {
+        "username": "refresh_user",
+        "email": "refresh@test.com",
+        "password": "password123"
+    }
+    await client.post("/api/v1/users/create", json=user_data)
+    tokens = (await client.post("/api/v1/auth/login", data={
+        "username": user_data["email"],
+        "password": user_data["password"]
+    })).json()
+
+    # O mesmo token duas vezes: a segunda verificação vem do cache
+    for _ in range(2):
+        response = await client.post("/api/v1/auth/test-token",
+                                     headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        assert response.status_code == 200
+
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+    # Refresh token não serve como access token (chaves diferentes)
+    response = await client.post("/api/v1/auth/test-token",
+                                 headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 403
+
+    response = await client.post("/api/v1/auth/test-token",
+                                 headers={"Authorization": f"Bearer {tokens['access_token']}x"})
+    assert response.status_code == 403
+
+
+async def test_refresh_with_cold_user_cache(client: AsyncClient):
+    user_data = {"username": "cold_user", "email": "cold@test.com", "password": "password123"}
+    await client.post("/api/v1/users/create", json=user_data)
+    tokens = (await client.post("/api/v1/auth/login", data={
+        "username": user_data["email"],
+        "password": user_data["password"]
+    })).json()
+
+    # Caso comum: o access token expirou e este worker não tem o usuário em cache
+    user_cache.clear()
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    # 'sub' que não é um UUID
+    response = await client.post("/api/v1/auth/refresh",
+                                 json={"refresh_token": create_refresh_token(data={"sub": "nao-e-uuid"})})
+    assert response.status_code == 401
+
+
+async def test_login_rate_limited_per_email(client: AsyncClient):
+    credentials = {"username": "alvo@test.com", "password": "errada123"}
+    for _ in range(10):
+        response = await client.post("/api/v1/auth/login", data=credentials)
+        assert response.status_code == 400
+
+    # O bucket do e-mail esgotou: 429 antes de consultar o usuário ou verificar a senha
+    response = await client.post("/api/v1/auth/login", data=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Outro e-mail, mesmo IP, ainda passa
+    response = await client.post("/api/v1/auth/login", data={"username": "outro@test.com", "password": "x"})
+    assert response.status_code == 400
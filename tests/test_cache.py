@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import Cache, CacheBackplane
+from app.core.rate_limit import MongoRateLimitBackend, RateLimit
+from app.models.task_model import Task
+
+
+async def test_shared_tier_and_cross_worker_invalidation():
+    database = Task.get_motor_collection().database
+    # Dois "workers" no mesmo processo, cada um com seu backplane e seu nível local
+    worker_a, worker_b = CacheBackplane(), CacheBackplane()
+    cache_a = Cache("test", maxsize=10, ttl=60, shared=True, plane=worker_a)
+    cache_b = Cache("test", maxsize=10, ttl=60, shared=True, plane=worker_b)
+    await worker_a.start(database)
+    await worker_b.start(database)
+    try:
+        await cache_a.set("key", "v1")
+        assert await cache_b.get("key") == "v1"  # lido do tier compartilhado
+        assert cache_b.stats()["shared_hits"] == 1
+        assert await cache_b.setdefault("other", "b") == "b"
+        assert await cache_a.setdefault("other", "a") == "b"
+
+        await cache_a.invalidate("key")
+        for _ in range(50):
+            if cache_b.local.get("key") is None:
+                break
+            await asyncio.sleep(0.1)
+        assert await cache_b.get("key") is None
+        assert worker_b.stats()["received"] >= 1
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+async def test_shared_misses_cached_until_published_write():
+    database = Task.get_motor_collection().database
+    worker_a, worker_b = CacheBackplane(), CacheBackplane()
+    cache_a = Cache("misses", maxsize=10, ttl=60, shared=True, plane=worker_a, miss_ttl=60)
+    cache_b = Cache("misses", maxsize=10, ttl=60, shared=True, plane=worker_b, miss_ttl=60)
+    await worker_a.start(database)
+    await worker_b.start(database)
+    try:
+        assert await cache_b.get("key") is None
+        assert await cache_b.get("key") is None
+        assert cache_b.stats()["shared_misses"] == 1  # a segunda ausência veio do nível local
+
+        await cache_a.set("key", "v1")
+        for _ in range(50):
+            if await cache_b.get("key") == "v1":
+                break
+            await asyncio.sleep(0.1)
+        assert await cache_b.get("key") == "v1"
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+async def test_mongo_rate_limit_backend_shares_buckets():
+    collection = Task.get_motor_collection().database["rate_limits"]
+    worker_a, worker_b = MongoRateLimitBackend(collection), MongoRateLimitBackend(collection)
+    limit = RateLimit.parse("2/minute")
+
+    assert await worker_a.consume("login:ip:1.2.3.4", limit) == 0
+    assert await worker_b.consume("login:ip:1.2.3.4", limit) == 0
+    retry_after = await worker_a.consume("login:ip:1.2.3.4", limit)
+    assert 0 < retry_after <= 30
+    assert await worker_b.consume("login:ip:5.6.7.8", limit) == 0
+
+
+def test_rate_limit_parse_rejects_empty_buckets():
+    assert RateLimit.parse("10/minute") == RateLimit(capacity=10, period=60)
+    for value in ("0/minute", "-1/hour", "10/week", "dez/minute"):
+        with pytest.raises(ValueError):
+            RateLimit.parse(value)
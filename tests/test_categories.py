@@ -1,14 +1,6 @@
-import pytest
 from httpx import AsyncClient
 import uuid
 
-@pytest.fixture
-async def auth_token(client: AsyncClient):
-    unique_id = uuid.uuid4().hex
-    user_data = {"username": f"cat_user_{unique_id}", "email": f"cat_{unique_id}@test.com", "password": "password123"}
-    await client.post("/api/v1/users/create", json=user_data)
-    login_res = await client.post("/api/v1/auth/login", data={"username": user_data["email"], "password": "password123"})
-    return login_res.json()["access_token"]
 
 async def test_create_category(client: AsyncClient, auth_token: str):
     headers = {"Authorization": f"Bearer {auth_token}"}
@@ -18,4 +10,38 @@ async def test_create_category(client: AsyncClient, auth_token: str):
     
     assert response.status_code == 201
     assert response.json()["name"] == "Trabalho"
-    assert "id" in response.json() or "_id" in response.json()
\ No newline at end of file
+    assert "id" in response.json() or "_id" in response.json()
+
+
+async def test_list_categories_sparse_fieldset(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await client.post("/api/v1/categories/create", json={"name": "Pessoal"}, headers=headers)
+
+    response = await client.get("/api/v1/categories/", headers=headers)
+    assert set(response.json()[0]) == {"id", "name", "color"}
+
+    response = await client.get("/api/v1/categories/", params={"fields": "id,name"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Pessoal"
+    assert set(response.json()[0]) == {"id", "name"}
+
+
+async def test_category_cache_invalidated_on_create(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    # Lista vazia fica em cache...
+    assert (await client.get("/api/v1/categories/", headers=headers)).json() == []
+
+    # ...e a criação a invalida: a categoria nova já vale para listagem e tarefas
+    res = await client.post("/api/v1/categories/create", json={"name": "Casa"}, headers=headers)
+    category_id = res.json()["id"]
+    assert [c["id"] for c in (await client.get("/api/v1/categories/", headers=headers)).json()] == [category_id]
+
+    res = await client.post("/api/v1/tasks/create", json={
+        "title": "Com categoria", "description": "x", "category": category_id
+    }, headers=headers)
+    assert res.status_code == 201
+
+    res = await client.post("/api/v1/tasks/create", json={
+        "title": "Categoria alheia", "description": "x", "category": str(uuid.uuid4())
+    }, headers=headers)
+    assert res.status_code == 404
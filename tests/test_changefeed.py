@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+import uuid
+
+from app.core.changefeed import ChangeFeed
+from app.models.task_model import Task
+
+
+async def is_replica_set() -> bool:
+    hello = await Task.get_motor_collection().database.client.admin.command("hello")
+    return bool(hello.get("setName"))
+
+
+async def test_stream_requires_replica_set(client: AsyncClient, auth_token: str):
+    if await is_replica_set():
+        pytest.skip("MongoDB em replica set")
+    response = await client.get("/api/v1/tasks/stream", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 503
+
+
+async def test_change_feed_fan_out_and_resume():
+    if not await is_replica_set():
+        pytest.skip("Change streams exigem replica set")
+    feed = ChangeFeed()
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    try:
+        subscription = await feed.subscribe(Task.get_motor_collection(), owner)
+        await Task(title="Outro dono", description="x", owner=other).insert()
+        task = Task(title="Do assinante", description="x", owner=owner)
+        await task.insert()
+
+        message = await asyncio.wait_for(subscription.queue.get(), 10)
+        assert b"event: insert" in message and b"Do assinante" in message
+        event_id = message.split(b"\n")[0].removeprefix(b"id: ").decode()
+
+        # Reconexão a partir do primeiro evento: recebe o que veio depois
+        await task.set({Task.status: True})
+        await asyncio.sleep(1)
+        resumed = await feed.subscribe(Task.get_motor_collection(), owner, event_id)
+        assert b"event: update" in await asyncio.wait_for(resumed.queue.get(), 10)
+
+        # Token desconhecido: reset
+        lost = await feed.subscribe(Task.get_motor_collection(), owner, "desconhecido")
+        assert b"event: reset" in lost.queue.get_nowait()
+    finally:
+        await feed.close()
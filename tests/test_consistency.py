@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import causal_tokens, read_preference
+from app.models.task_model import Task
+
+
+async def is_replica_set() -> bool:
+    hello = await Task.get_motor_collection().database.client.admin.command("hello")
+    return bool(hello.get("setName"))
+
+
+def test_route_read_preferences(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_ROUTE_READ_PREFERENCES", {"list_tasks": "secondaryPreferred"})
+    assert read_preference("list_tasks").mongos_mode == "secondaryPreferred"
+    assert read_preference("get_task").mongos_mode == settings.MONGO_READ_PREFERENCE
+
+
+async def test_read_your_writes_from_secondaries(client: AsyncClient, auth_token: str, monkeypatch):
+    if not await is_replica_set():
+        pytest.skip("Sessões causais exigem replica set (ex.: mongod --replSet rs0 de um nó)")
+    monkeypatch.setattr(settings, "MONGO_ROUTE_READ_PREFERENCES", {
+        route: "secondaryPreferred" for route in ("list_tasks", "get_task", "task_stats", "get_current_user")
+    })
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    owner = UUID((await client.get("/api/v1/users/me", headers=headers)).json()["id"])
+
+    response = await client.post("/api/v1/tasks/create", json={"title": "Recém-criada", "description": "x"}, headers=headers)
+    task_id = response.json()["id"]
+    # O ponto da escrita fica guardado para as próximas requisições do usuário
+    assert await causal_tokens.get(owner) is not None
+
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert task_id in [task["id"] for task in response.json()]
+
+    await client.put(f"/api/v1/tasks/{task_id}", json={"status": True}, headers=headers)
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.json()["status"] is True
+    assert (await client.get("/api/v1/tasks/stats", headers=headers)).json()["done"] == 1
@@ -0,0 +1,90 @@
+import pytest
+from httpx import AsyncClient
+from uuid import UUID
+import uuid
+
+from datetime import datetime, UTC
+
+from bson import Binary
+from app.services.archive_service import ArchiveService
+from app.core.indexes import verify_indexes
+from app.models.category_model import Category
+from app.models.task_model import Task
+from app.models.user_model import User
+
+
+@pytest.fixture
+async def owner(client: AsyncClient):
+    """Cria um usuário com uma categoria e algumas tarefas; retorna (headers, owner_id, category_id)."""
+    unique_id = uuid.uuid4().hex
+    user_data = {"username": f"idx_{unique_id}", "email": f"idx_{unique_id}@test.com", "password": "password123"}
+    await client.post("/api/v1/users/create", json=user_data)
+    login_res = await client.post("/api/v1/auth/login", data={"username": user_data["email"], "password": "password123"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    owner_id = UUID((await client.get("/api/v1/users/me", headers=headers)).json()["id"])
+    cat_res = await client.post("/api/v1/categories/create", json={"name": "Índices"}, headers=headers)
+    category_id = UUID(cat_res.json()["id"])
+    for i in range(3):
+        await client.post("/api/v1/tasks/create",
+                          json={"title": f"Tarefa {i}", "description": "Desc", "category": str(category_id)},
+                          headers=headers)
+    return headers, owner_id, category_id
+
+
+def _stages(plan: dict) -> list:
+    """Coleta recursivamente os estágios do plano vencedor."""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _stages(child)
+    return stages
+
+
+async def _assert_ixscan(collection, query: dict, sort=None):
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = await cursor.explain()
+    stages = _stages(explain["queryPlanner"]["winningPlan"])
+    # Versões recentes do MongoDB usam variantes como IDHACK/EXPRESS_IXSCAN para _id
+    assert any(s and ("IXSCAN" in s or s == "IDHACK") for s in stages), stages
+    assert "COLLSCAN" not in stages, stages
+
+
+async def test_handler_queries_use_indexes(owner):
+    _, owner_id, category_id = owner
+    owner_bin = Binary.from_uuid(owner_id)
+    tasks = Task.get_motor_collection()
+    categories = Category.get_motor_collection()
+    any_task = await tasks.find_one({"owner": owner_bin})
+
+    sort = [("created_at", 1), ("_id", 1)]
+    active = {"deleted_at": None}
+    await _assert_ixscan(tasks, {"owner": owner_bin, **active}, sort)                   # list_tasks
+    await _assert_ixscan(tasks, {"owner": owner_bin, "status": False, **active}, sort)  # list_tasks?task_status=
+    await _assert_ixscan(tasks, {"_id": any_task["_id"], "owner": owner_bin, **active}) # get/update/delete_task
+    await _assert_ixscan(tasks, {"owner": owner_bin, "category": Binary.from_uuid(category_id)})
+    await _assert_ixscan(categories, {"owner": owner_bin})                         # list_categories
+    await _assert_ixscan(categories, {"owner": owner_bin, "name": "Índices"})      # create_category
+    await _assert_ixscan(categories, {"_id": Binary.from_uuid(category_id), "owner": owner_bin})
+    # Arquivamento: cada ramo do $or usa um índice parcial
+    for branch in ArchiveService.archivable_filter(datetime.now(UTC))["$or"]:
+        await _assert_ixscan(tasks, branch)
+
+
+async def test_verify_indexes_reports_drift(owner):
+    report = await verify_indexes([User, Task, Category])
+    assert report["tasks"] == {"missing": [], "unexpected": [], "mismatched": []}
+
+    await Task.get_motor_collection().create_index([("title", 1)], name="stray_title")
+    report = await verify_indexes([Task])
+    assert report["tasks"]["unexpected"] == ["stray_title"]
+
+
+async def test_duplicate_category_name_rejected(client: AsyncClient, owner):
+    headers, _, _ = owner
+    response = await client.post("/api/v1/categories/create", json={"name": "Índices"}, headers=headers)
+    assert response.status_code == 400
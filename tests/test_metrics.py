@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+METRICS_HEADERS = {"Authorization": "Bearer metrics-test-token"}
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-test-token")
+
+
+async def test_pool_stats(client: AsyncClient):
+    response = await client.get("/api/v1/metrics/pool", headers=METRICS_HEADERS)
+    assert response.status_code == 200
+    assert {"checked_out", "waiters", "avg_wait_ms", "max_pool_size"} <= set(response.json())
+
+
+async def test_runtime_stats(client: AsyncClient):
+    response = await client.get("/api/v1/metrics/runtime", headers=METRICS_HEADERS)
+    assert response.status_code == 200
+    assert {"hits", "misses"} <= set(response.json()["user_cache"])
+    assert "queue_depth" in response.json()["password_hasher"]
+
+
+async def test_server_timing_and_route_histogram(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == 200
+    assert "jwt;dur=" in response.headers["server-timing"]
+    assert "total;dur=" in response.headers["server-timing"]
+
+    response = await client.get("/api/v1/metrics/prometheus", headers=METRICS_HEADERS)
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/tasks/",status="200"}' in response.text
+
+
+async def test_metrics_require_token(client: AsyncClient, auth_token: str, monkeypatch):
+    assert (await client.get("/api/v1/metrics/runtime")).status_code == 401
+    # Um access token de usuário não serve
+    response = await client.get("/api/v1/metrics/runtime", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 401
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert (await client.get("/api/v1/metrics/runtime", headers=METRICS_HEADERS)).status_code == 404
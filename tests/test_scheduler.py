@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, UTC
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.scheduler import CronTrigger, Scheduler
+
+
+def test_cron_next_after():
+    after = datetime(2024, 1, 31, 3, 0, 30, tzinfo=UTC)  # quarta-feira
+    assert CronTrigger("0 3 * * *").next_after(after) == datetime(2024, 2, 1, 3, 0, tzinfo=UTC)
+    assert CronTrigger("*/15 * * * *").next_after(after) == datetime(2024, 1, 31, 3, 15, tzinfo=UTC)
+    assert CronTrigger("30 8 * * 1-5").next_after(datetime(2024, 2, 2, 9, 0, tzinfo=UTC)) == \
+        datetime(2024, 2, 5, 8, 30, tzinfo=UTC)  # sexta 9h -> segunda 8h30
+    assert CronTrigger("0 0 29 2 *").next_after(after) == datetime(2024, 2, 29, 0, 0, tzinfo=UTC)
+
+    with pytest.raises(ValueError):
+        CronTrigger("61 * * * *")
+    with pytest.raises(ValueError):
+        CronTrigger("* * *")
+
+
+async def test_scheduler_skips_overlapping_runs_and_cancels_on_shutdown():
+    scheduler = Scheduler()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_job():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    def failing_job():
+        raise RuntimeError("boom")
+
+    scheduler.add_job("slow", slow_job, every=0.05, run_on_start=True)
+    scheduler.add_job("failing", failing_job, every=0.05, run_on_start=True)
+    scheduler.start()
+    await asyncio.wait_for(started.wait(), 1)
+    await asyncio.sleep(0.2)
+
+    stats = scheduler.stats()["jobs"]
+    assert stats["slow"]["running"] == 1 and stats["slow"]["skipped"] >= 1
+    assert stats["failing"]["failures"] >= 1 and "boom" in stats["failing"]["last_error"]
+
+    await scheduler.shutdown(timeout=0.1)
+    assert cancelled == [True]
+    assert scheduler.stats()["running"] is False
+
+
+async def test_jobs_metrics(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-test-token")
+    response = await client.get("/api/v1/metrics/jobs", headers={"Authorization": "Bearer metrics-test-token"})
+    assert response.status_code == 200
+    assert "jobs" in response.json()
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.core.security import hash_password_async, password_context, password_hasher, verify_password_async
+
+
+async def test_password_hasher_pool_limits_concurrency():
+    calls = password_hasher.max_concurrency * 2
+    peak = {"in_flight": 0, "queue_depth": 0}
+
+    async def watch():
+        while True:
+            stats = password_hasher.stats()
+            peak["in_flight"] = max(peak["in_flight"], stats["in_flight"])
+            peak["queue_depth"] = max(peak["queue_depth"], stats["queue_depth"])
+            await asyncio.sleep(0.001)
+
+    watcher = asyncio.create_task(watch())
+    try:
+        hashed = await asyncio.gather(*(hash_password_async(f"lenta-{i}") for i in range(calls // 2 + 1)))
+        assert all(password_context.verify(f"lenta-{i}", h) for i, h in enumerate(hashed))
+
+        # A verificação usa o custo gravado no hash: custo baixo mantém o teste rápido
+        passwords = [f"senha-{i}" for i in range(calls)]
+        hashes = [password_context.hash(p, rounds=4) for p in passwords]
+        checks = await asyncio.gather(
+            *(verify_password_async(p, h) for p, h in zip(passwords, hashes)),
+            *(verify_password_async(p + "x", h) for p, h in zip(passwords, hashes)),
+        )
+    finally:
+        watcher.cancel()
+
+    assert checks == [True] * calls + [False] * calls
+    # Nunca mais que max_concurrency no pool; o excedente espera na fila
+    assert 0 < peak["in_flight"] <= password_hasher.max_concurrency
+    assert 0 < peak["queue_depth"] <= 2 * calls - password_hasher.max_concurrency
+
+    stats = password_hasher.stats()
+    assert (stats["in_flight"], stats["queue_depth"]) == (0, 0)
@@ -1,23 +1,19 @@
 import pytest
 from httpx import AsyncClient
 import uuid
+import json
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+from beanie.odm.utils.encoder import Encoder
+
+from app.core.config import settings
+from app.core.database import routed_collection
+from app.models.task_model import Task
+from app.models.task_archive_model import TaskArchive
+from app.services import task_service
+from app.services.archive_service import ArchiveService
+from app.services.task_service import TaskService, stats_cache
 
-@pytest.fixture
-async def auth_token(client: AsyncClient):
-    """Cria um utilizador e retorna o token de acesso."""
-    unique_id = uuid.uuid4().hex
-    user_data = {
-        "username": f"user_{unique_id}",
-        "email": f"owner_{unique_id}@test.com",
-        "password": "password123"
-    }
-    await client.post("/api/v1/users/create", json=user_data)
-    
-    login_res = await client.post("/api/v1/auth/login", data={
-        "username": user_data["email"],
-        "password": "password123"
-    })
-    return login_res.json()["access_token"]
 
 # 1. Testar Criação
 async def test_create_task(client: AsyncClient, auth_token: str):
@@ -28,6 +24,7 @@ async def test_create_task(client: AsyncClient, auth_token: str):
     assert response.status_code == 201
     assert response.json()["title"] == payload["title"]
 
+
 # 2. Testar Listagem de Tarefas
 async def test_get_tasks(client: AsyncClient, auth_token: str):
     headers = {"Authorization": f"Bearer {auth_token}"}
@@ -47,6 +44,7 @@ async def test_get_tasks(client: AsyncClient, auth_token: str):
     # Assegura que há pelo menos uma tarefa na lista
     assert len(data) >= 1
 
+
 async def test_delete_task_security(client: AsyncClient, auth_token: str):
     headers_owner = {"Authorization": f"Bearer {auth_token}"}
     
@@ -77,7 +75,8 @@ async def test_delete_task_security(client: AsyncClient, auth_token: str):
     # 3. Tenta apagar
     res_del = await client.delete(f"/api/v1/tasks/{task_id}", headers=headers_inv)
     assert res_del.status_code in [403, 404]
-    
+
+
 # 4. Testar Atualização e Segurança do Update
 async def test_update_task_security(client: AsyncClient, auth_token: str):
     headers_owner = {"Authorization": f"Bearer {auth_token}"}
@@ -117,7 +116,8 @@ async def test_update_task_security(client: AsyncClient, auth_token: str):
     assert res_upd_owner.status_code == 200
     assert res_upd_owner.json()["status"] is True
     assert res_upd_owner.json()["title"] == "Tarefa Concluída"
-    
+
+
 async def test_create_task_with_category(client: AsyncClient, auth_token: str):
     headers = {"Authorization": f"Bearer {auth_token}"}
 
@@ -140,4 +140,312 @@ async def test_create_task_with_category(client: AsyncClient, auth_token: str):
     assert task_res.status_code == 201
     task_data = task_res.json()
     assert task_data["title"] == "Configurar Banco de Dados"
-    assert task_data["category"] == category_id # Garante que o vínculo foi salvo
\ No newline at end of file
+    assert task_data["category"] == category_id # Garante que o vínculo foi salvo
+
+
+async def test_list_tasks_cursor_pagination(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(5):
+        await client.post("/api/v1/tasks/create",
+                          json={"title": f"Tarefa {i}", "description": "Paginação"},
+                          headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/tasks/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Todas as tarefas aparecem exatamente uma vez, na ordem de criação
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    response = await client.get("/api/v1/tasks/", params={"cursor": "invalido"}, headers=headers)
+    assert response.status_code == 400
+
+    response = await client.get("/api/v1/tasks/", params={"limit": settings.LIST_MAX_LIMIT + 1}, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_search_tasks_by_prefix_with_ranking(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await client.post("/api/v1/tasks/create",
+                      json={"title": "Ligar para o fornecedor", "description": "Confirmar entrega do leite"},
+                      headers=headers)
+    await client.post("/api/v1/tasks/create",
+                      json={"title": "Comprar leite", "description": "Desnatado"},
+                      headers=headers)
+    await client.post("/api/v1/tasks/create",
+                      json={"title": "Reunião com cliente", "description": "Apresentar proposta"},
+                      headers=headers)
+
+    # Prefixo: 'lei' casa 'leite' no título (peso maior) e na descrição
+    response = await client.get("/api/v1/tasks/", params={"q": "lei"}, headers=headers)
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()] == ["Comprar leite", "Ligar para o fornecedor"]
+
+    # Sem acento e em minúsculas
+    response = await client.get("/api/v1/tasks/", params={"q": "reuniao"}, headers=headers)
+    assert [t["title"] for t in response.json()] == ["Reunião com cliente"]
+
+    # 'title' restringe ao título
+    response = await client.get("/api/v1/tasks/", params={"title": "leite"}, headers=headers)
+    assert [t["title"] for t in response.json()] == ["Comprar leite"]
+
+
+async def test_bulk_create_update_delete(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    cat_res = await client.post("/api/v1/categories/create", json={"name": "Lote"}, headers=headers)
+    category_id = cat_res.json()["id"]
+
+    items = [
+        {"title": "Lote 1", "description": "a", "category": category_id},
+        {"title": "Lote 2", "description": "b"},
+        {"title": "Lote 3", "description": "c", "category": str(uuid.uuid4())},  # categoria de outro dono
+    ]
+    response = await client.post("/api/v1/tasks/bulk", json=items, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "created", "error"]
+    created_ids = [r["id"] for r in body["results"][:2]]
+
+    updates = [
+        {"id": created_ids[0], "status": True},
+        {"id": created_ids[1], "title": "Lote 2 revisado"},
+        {"id": str(uuid.uuid4()), "status": True},
+    ]
+    response = await client.patch("/api/v1/tasks/bulk", json=updates, headers=headers)
+    assert [r["status"] for r in response.json()["results"]] == ["updated", "updated", "error"]
+
+    task = (await client.get(f"/api/v1/tasks/{created_ids[1]}", headers=headers)).json()
+    assert task["title"] == "Lote 2 revisado"
+
+    # Id repetido: só a primeira ocorrência é aplicada
+    updates = [{"id": created_ids[0], "status": False}, {"id": created_ids[0], "status": True}]
+    response = await client.patch("/api/v1/tasks/bulk", json=updates, headers=headers)
+    assert [r["status"] for r in response.json()["results"]] == ["updated", "error"]
+
+    response = await client.request("DELETE", "/api/v1/tasks/bulk",
+                                    json={"ids": created_ids + [str(uuid.uuid4()), created_ids[0]]}, headers=headers)
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "deleted", "error", "error"]
+    assert response.json()["succeeded"] == 2
+
+    # Já removidas: nada é reportado como removido de novo
+    response = await client.request("DELETE", "/api/v1/tasks/bulk", json={"ids": created_ids}, headers=headers)
+    assert [r["status"] for r in response.json()["results"]] == ["error", "error"]
+
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.json() == []
+
+
+async def test_update_task_returns_fresh_document_and_bumps_updated_at(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    res_create = await client.post("/api/v1/tasks/create",
+                                   json={"title": "Antes", "description": "Desc"},
+                                   headers=headers)
+    task_id = res_create.json()["id"]
+    before = await Task.get(task_id)
+
+    response = await client.put(f"/api/v1/tasks/{task_id}", json={"title": "Depois"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Depois"
+
+    after = await Task.get(task_id)
+    assert after.updated_at > before.updated_at
+    # Os campos de busca acompanham o novo título
+    assert "depois" in after.search_terms and "antes" not in after.search_terms
+
+    # Categoria de outro usuário é rejeitada antes de qualquer escrita
+    response = await client.put(f"/api/v1/tasks/{task_id}", json={"category": str(uuid.uuid4())}, headers=headers)
+    assert response.status_code == 404
+
+
+async def test_list_tasks_sparse_fieldset(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(2):
+        await client.post("/api/v1/tasks/create", json={"title": f"Campos {i}", "description": "x"}, headers=headers)
+
+    response = await client.get("/api/v1/tasks/", params={"fields": "id,title", "limit": 1}, headers=headers)
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "title"}
+    # O cursor continua funcionando mesmo sem created_at na resposta
+    assert response.headers.get("X-Next-Cursor")
+
+    response = await client.get("/api/v1/tasks/", params={"fields": "owner"}, headers=headers)
+    assert response.status_code == 400
+
+
+async def test_task_stats(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = []
+    for i in range(3):
+        res = await client.post("/api/v1/tasks/create", json={"title": f"Estatística {i}", "description": "x"}, headers=headers)
+        ids.append(res.json()["id"])
+    await client.put(f"/api/v1/tasks/{ids[0]}", json={"status": True}, headers=headers)
+
+    response = await client.get("/api/v1/tasks/stats", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats["total"], stats["done"], stats["pending"]) == (3, 1, 2)
+    assert stats["by_category"] == [{"category": None, "count": 3}]
+    assert sum(day["count"] for day in stats["by_day"]) == 3
+
+    # Escritas invalidam o cache das estatísticas
+    await client.delete(f"/api/v1/tasks/{ids[1]}", headers=headers)
+    response = await client.get("/api/v1/tasks/stats", headers=headers)
+    assert response.json()["total"] == 2
+
+
+async def test_stats_computed_during_a_write_are_not_cached(client: AsyncClient, auth_token: str, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    owner = uuid.UUID((await client.get("/api/v1/users/me", headers=headers)).json()["id"])
+
+    # Uma escrita termina depois da agregação ler, mas antes do resultado ir para o cache
+    def racing_collection(model, route):
+        collection = routed_collection(model, route)
+
+        def aggregate(*args, **kwargs):
+            cursor = collection.aggregate(*args, **kwargs)
+
+            async def to_list(length):
+                docs = await cursor.to_list(length)
+                await Task(title="Concorrente", description="x", owner=owner).insert()
+                await TaskService.tasks_changed(owner)
+                return docs
+            return SimpleNamespace(to_list=to_list)
+        return SimpleNamespace(aggregate=aggregate)
+
+    monkeypatch.setattr(task_service, "routed_collection", racing_collection)
+    assert (await TaskService.get_stats(owner)).total == 0
+    assert await stats_cache.get(owner) is None
+
+    monkeypatch.setattr(task_service, "routed_collection", routed_collection)
+    response = await client.get("/api/v1/tasks/stats", headers=headers)
+    assert response.json()["total"] == 1
+
+
+async def test_list_tasks_conditional_get(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    res = await client.post("/api/v1/tasks/create", json={"title": "Com ETag", "description": "x"}, headers=headers)
+    task_id = res.json()["id"]
+
+    for url in ("/api/v1/tasks/", f"/api/v1/tasks/{task_id}"):
+        response = await client.get(url, headers=headers)
+        etag = response.headers["ETag"]
+        response = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    # Qualquer escrita muda a versão: o ETag antigo deixa de valer
+    await client.put(f"/api/v1/tasks/{task_id}", json={"status": True}, headers=headers)
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] is True
+
+    # Tarefa removida ou inexistente é 404, mesmo com um If-None-Match que casaria
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    for url in (f"/api/v1/tasks/{task_id}", f"/api/v1/tasks/{uuid.uuid4()}"):
+        response = await client.get(url, headers={**headers, "If-None-Match": "*"})
+        assert response.status_code == 404
+
+
+async def test_export_tasks(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        await client.post("/api/v1/tasks/create", json={"title": f"Exportada {i}", "description": "x"}, headers=headers)
+
+    response = await client.get("/api/v1/tasks/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Exportada 0", "Exportada 1", "Exportada 2"]
+    assert {"id", "status", "created_at", "updated_at"} <= set(rows[0])
+
+    response = await client.get("/api/v1/tasks/export", params={"format": "csv"}, headers=headers)
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,title,description,status")
+    assert len(lines) == 4
+
+
+async def test_import_tasks(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    body = "\n".join([
+        json.dumps({"title": "Importada 1", "description": "x"}),
+        json.dumps({"title": "a", "description": "x"}),  # título curto demais
+        "isto não é json",
+        "",
+        json.dumps({"title": "Importada 2", "description": "x", "category": str(uuid.uuid4())}),  # categoria alheia
+        json.dumps({"title": "Importada 3", "description": "y"}),
+    ])
+    response = await client.post("/api/v1/tasks/import", content=body.encode(),
+                                 headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["lines"], result["imported"], result["failed"]) == (5, 2, 3)
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert {task["title"] for task in response.json()} == {"Importada 1", "Importada 3"}
+
+
+async def test_list_tasks_compressed(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(5):
+        await client.post("/api/v1/tasks/create", json={"title": f"Grande {i}", "description": "d" * 400}, headers=headers)
+
+    response = await client.get("/api/v1/tasks/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 5
+
+    # Corpos abaixo do limite mínimo seguem sem compressão
+    response = await client.get("/api/v1/tasks/", params={"limit": 1, "fields": "id"},
+                                headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+async def test_soft_delete_and_archive(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = await client.post("/api/v1/tasks/create", json={"title": "Removida", "description": "x"}, headers=headers)
+    task_id = response.json()["id"]
+
+    assert (await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)).status_code == 204
+    assert (await client.get(f"/api/v1/tasks/{task_id}", headers=headers)).status_code == 404
+    assert (await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)).status_code == 404
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert task_id not in [task["id"] for task in response.json()]
+
+    # A remoção é lógica: o documento continua na coleção até o arquivamento
+    task = await Task.get(uuid.UUID(task_id))
+    assert task.deleted_at is not None
+
+    await ArchiveService.archive_tasks(now=datetime.now(UTC) + timedelta(days=2))
+    assert await Task.get(uuid.UUID(task_id)) is None
+    archived = await TaskArchive.get(uuid.UUID(task_id))
+    assert archived.title == "Removida" and archived.archived_at is not None
+
+
+async def test_backfill_search_terms_for_legacy_tasks(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    res = await client.post("/api/v1/tasks/create", json={"title": "Relatório antigo", "description": "x"}, headers=headers)
+    task_id = res.json()["id"]
+
+    # Simula uma tarefa gravada antes dos campos de busca existirem
+    await Task.get_motor_collection().update_one(
+        Encoder().encode({"_id": uuid.UUID(task_id)}), {"$unset": {"title_terms": "", "description_terms": "", "search_terms": ""}}
+    )
+    response = await client.get("/api/v1/tasks/", params={"title": "relatorio"}, headers=headers)
+    assert response.json() == []
+
+    assert await Task.backfill_search_terms() == 1
+    assert await Task.backfill_search_terms() == 0  # Idempotente
+    response = await client.get("/api/v1/tasks/", params={"title": "relatorio"}, headers=headers)
+    assert [task["id"] for task in response.json()] == [task_id]